@@ -100,6 +100,29 @@ with open(f"files/benchmarks_closure-tmp.csv", "w") as f:
 	f.write(lines)
 	
 
+"""
+	calibration of closure costs
+import statistics
+level = 4
+costs = {strategy: [] for strategy in MatrixBinary.closure_costs}
+for n in range(50,450,50):
+	m = MatrixBinary(random=(n,n), level=level)
+	line = [str(n)]
+	for strategy in costs:
+		t1 = datetime.datetime.now()
+		result = m.closure(strategy)
+		t2 = datetime.datetime.now()
+		products = result['operations'] if strategy == 'optimized' else result['deep']
+		costs[strategy].append((t2 - t1).total_seconds() / (n * n * max(products, 1)))
+		line.append(f"{strategy}:{(t2 - t1).total_seconds()}")
+	print(','.join(line))
+
+costs = {strategy: statistics.median(values) for strategy, values in costs.items()}
+print(costs)
+MatrixBinary.closure_costs_save("files/closure_costs.json", costs)
+"""
+
+
 """
 	PERFORMANCE MATRIX_BOOLEAN
 from graphm import MatrixBoolean
@@ -1,16 +1,46 @@
-import graphm.factor
-import graphm.graph
-import graphm.graphpert
-import graphm.matrixbinary
-import graphm.matrixbinaryclosure
-import graphm.matrixbinaryslides
-import graphm.matrixboolean
-Factor = graphm.factor.Factor
-Graph = graphm.graph.Graph
-GraphPert = graphm.graphpert.GraphPert
-MatrixBinary = graphm.matrixbinary.MatrixBinary
-MatrixBinaryClosure = graphm.matrixbinaryclosure.MatrixBinaryClosure
-MatrixBinarySlides = graphm.matrixbinaryslides.MatrixBinarySlides
-MatrixBoolean = graphm.matrixboolean.MatrixBoolean
+import importlib
+
+# classes exported by the package indexed by name, with their modules imported at the first access
+classes = {
+	'DotWriter': 'graphm.dotwriter',
+	'Factor': 'graphm.factor',
+	'Graph': 'graphm.graph',
+	'GraphM': 'graphm.graphmatrix',
+	'GraphPert': 'graphm.graphpert',
+	'MatrixBinary': 'graphm.matrixbinary',
+	'MatrixBinaryClosure': 'graphm.matrixbinaryclosure',
+	'MatrixBinarySlides': 'graphm.matrixbinaryslides',
+	'MatrixBoolean': 'graphm.matrixboolean',
+	'PertSimulation': 'graphm.pertsimulation',
+	'RenderBatch': 'graphm.renderbatch',
+	'RenderCache': 'graphm.rendercache',
+	'TopologicalOrder': 'graphm.topologicalorder',
+	}
+__all__ = list(classes)
+
+# submodules imported at their first access as attributes of the package
+modules = (
+	'amatrix', 'dotwriter', 'factor', 'graph', 'graphmatrix', 'graphpert', 'matrix', 'matrixbinary',
+	'matrixbinaryclosure', 'matrixbinaryslides', 'matrixboolean', 'pertsimulation', 'renderbatch',
+	'rendercache', 'topologicalorder',
+	)
+
+def __getattr__(name: str) -> object:
+	""" Import the module of an exported class, or a submodule, at its first access (PEP 562)
+	
+	Workers using only matrices never import pygraphviz
+	"""
+	# other names are rejected before any import, probes like hasattr never import
+	if name not in classes and name not in modules:
+		raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+	if name in classes:
+		cls = getattr(importlib.import_module(classes[name]), name)
+		globals()[name] = cls
+		return cls
+	# submodules like graphm.matrixbinary, set in globals by the import
+	return importlib.import_module(f"graphm.{name}")
+
+def __dir__() -> list:
+	return sorted(set(globals()) | set(classes) | set(modules))
 
 #print("chargement du package", __name__)
@@ -0,0 +1,227 @@
+'''
+Created on Oct 19, 2026
+'''
+import subprocess
+import graphm.matrixbinary
+
+class DotWriter(object):
+	""" Stream a graph in DOT format to a file object
+
+	Nodes and edges are written as they are given and never kept in memory,
+	so the memory is constant whatever the number of edges. The file object can be
+	the input of a layout program running in another process, see :meth:`DotWriter.open_layout`
+
+	Attributes of the graph, nodes and edges are written once in the header.
+	The values 'directed' and 'strict' of the graph attributes give the type of graph
+
+	:var int buffer_lines: number of lines buffered before writing to the file
+
+		**1024**
+
+	.. CAUTION:: Instance variables
+
+	:var file: file object where the graph is written
+	:var str arrow: operator of edges, '->' for directed graphs otherwise '--'
+	:var list lines: lines buffered
+	:var subprocess.Popen process: layout program reading the graph, or None
+
+	>>> import io
+	>>> f = io.StringIO()
+	>>> with DotWriter(f, graph_attr={'directed': True, 'label': 'G'}, node_attr={'shape': 'circle'}) as w:
+	... 	w.add_binary([1, 4, 2], 3, ['A', 'B', 'C'])
+	>>> print(f.getvalue())
+	digraph "" {
+	graph ["label"="G"];
+	node ["shape"="circle"];
+	"A";
+	"B";
+	"C";
+	"A" -> "C";
+	"B" -> "A";
+	"C" -> "B";
+	}
+	<BLANKLINE>
+	"""
+	buffer_lines = 1024
+
+	def __init__(self, file, name: str='', graph_attr: dict=None, node_attr: dict=None, edge_attr: dict=None):
+		""" Write the header of the graph
+
+		:param file: file object opened in text mode
+		:param str name: name of the graph
+		:param dict graph_attr: attributes of the graph, with optionally 'directed' and 'strict'
+
+			default: directed and not strict
+
+		:param dict node_attr: default attributes of nodes
+		:param dict edge_attr: default attributes of edges
+		"""
+		graph_attr = dict(graph_attr) if graph_attr else {}
+		directed = str(graph_attr.pop('directed', True)) not in ('False', 'false', '0')
+		strict = str(graph_attr.pop('strict', False)) not in ('False', 'false', '0')
+
+		self.file = file
+		self.arrow = ' -> ' if directed else ' -- '
+		self.lines = [f"{'strict ' if strict else ''}{'digraph' if directed else 'graph'} {DotWriter.quote(name)} {{"]
+		self.process = None
+		for kind, attrs in (('graph', graph_attr), ('node', node_attr), ('edge', edge_attr)):
+			if attrs:
+				self.lines.append(f"{kind} [{DotWriter.get_attrs(attrs)}];")
+
+	def __enter__(self) -> 'DotWriter':
+		return self
+
+	def __exit__(self, exc_type, exc_value, traceback) -> None:
+		""" Close the graph, or on error leave it without its closing brace so it is never taken as complete
+
+		On error the layout program is stopped without drawing a partial graph
+
+		>>> import io
+		>>> f = io.StringIO()
+		>>> with DotWriter(f) as w:
+		... 	w.add_edge('A', 'B')
+		... 	raise KeyError('C')
+		Traceback (most recent call last):
+		...
+		KeyError: 'C'
+		>>> f.getvalue().rstrip().endswith('}')
+		False
+		"""
+		if exc_type is None:
+			self.close()
+		elif self.process is None:
+			self.flush()
+		else:
+			# the pipe is closed first, the layout program never waits for more lines
+			try:
+				self.file.close()
+			except OSError:
+				pass
+			self.process.kill()
+			self.process.wait()
+
+	@staticmethod
+	def quote(value) -> str:
+		""" Return the value in a DOT string
+
+		:param value: value to convert
+
+		:return: the quoted value
+		:rtype: str
+
+		>>> DotWriter.quote('say "hi"')
+		'"say \\\\"hi\\\\""'
+		"""
+		return '"' + str(value).replace('"', '\\"') + '"'
+
+	@staticmethod
+	def get_attrs(attrs: dict) -> str:
+		""" Return attributes in DOT format
+
+		:param dict attrs: attributes
+
+		:return: attributes separated by comma
+		:rtype: str
+
+		>>> DotWriter.get_attrs({'color': 'red', 'width': 0.5})
+		'"color"="red", "width"="0.5"'
+		"""
+		return ', '.join(f"{DotWriter.quote(key)}={DotWriter.quote(value)}" for key, value in attrs.items())
+
+	def write(self, line: str) -> None:
+		""" Buffer a line and write the buffer when it is full
+
+		:param str line: a line in DOT format
+		"""
+		self.lines.append(line)
+		if len(self.lines) >= self.buffer_lines:
+			self.flush()
+
+	def flush(self) -> None:
+		""" Write the buffered lines to the file
+		"""
+		if self.lines:
+			self.file.write('\n'.join(self.lines) + '\n')
+			self.lines = []
+
+	def add_node(self, node: str, **attr) -> None:
+		""" Write a node
+
+		:param str node: name of node
+		:param dict \*\*attr: attributes of the node
+		"""
+		self.write(f"{DotWriter.quote(node)} [{DotWriter.get_attrs(attr)}];" if attr else f"{DotWriter.quote(node)};")
+
+	def add_nodes_from(self, nodes: iter) -> None:
+		""" Write nodes
+
+		:param iter nodes: names of nodes
+		"""
+		for node in nodes:
+			self.write(f"{DotWriter.quote(node)};")
+
+	def add_edge(self, u: str, v: str, **attr) -> None:
+		""" Write an edge
+
+		:param str u: starting node
+		:param str v: ending node
+		:param dict \*\*attr: attributes of the edge
+		"""
+		edge = DotWriter.quote(u) + self.arrow + DotWriter.quote(v)
+		self.write(f"{edge} [{DotWriter.get_attrs(attr)}];" if attr else f"{edge};")
+
+	def add_edges_from(self, edges: iter) -> None:
+		""" Write edges
+
+		:param iter edges: edges in tuple (u, v) or (u, v, label)
+		"""
+		for edge in edges:
+			if len(edge) > 2 and edge[2] not in (None, ''):
+				self.add_edge(edge[0], edge[1], label=edge[2])
+			else:
+				self.add_edge(edge[0], edge[1])
+
+	def add_binary(self, matrixM: iter, dimN: int, nodes: list) -> None:
+		""" Write nodes and edges of a binary matrix
+
+		Edges are found by iterating the set bits of each row, the rows can be generated lazily,
+		see :meth:`graphm.matrixbinary.MatrixBinary.iter_edges`
+
+		:param iter matrixM: rows of a binary matrix in integers, see :class:`graphm.matrixbinary.MatrixBinary`
+		:param int dimN: number of columns
+		:param list nodes: names of nodes, for rows and columns
+		"""
+		nodes = [DotWriter.quote(node) for node in nodes]
+		for node in nodes[:dimN]:
+			self.write(node + ';')
+		for m, n in graphm.matrixbinary.MatrixBinary.iter_edges(matrixM, dimN):
+			self.write(f"{nodes[m]}{self.arrow}{nodes[n]};")
+
+	def close(self) -> None:
+		""" Write the end of the graph, wait for the layout program if one reads the graph
+
+		If the layout program fails a :class:`subprocess.CalledProcessError` is raised
+		"""
+		self.write('}')
+		self.flush()
+		if self.process is not None:
+			self.file.close()
+			if self.process.wait():
+				raise subprocess.CalledProcessError(self.process.returncode, self.process.args)
+
+	@staticmethod
+	def open_layout(path: str, ext: str='png', prog: str='dot', **d) -> 'DotWriter':
+		""" Return a writer streaming the graph to a layout program running in another process
+
+		:param str path: path of the file drawn
+		:param str ext: format of the file drawn
+		:param str prog: layout program, dot, neato, twopi, circo, fdp...
+		:param dict \*\*d: arguments of :class:`DotWriter`
+
+		:return: the writer, the drawing is finished when it is closed
+		:rtype: DotWriter
+		"""
+		process = subprocess.Popen([prog, f"-T{ext}", '-o', path], stdin=subprocess.PIPE, text=True, encoding='utf-8')
+		writer = DotWriter(process.stdin, **d)
+		writer.process = process
+		return writer
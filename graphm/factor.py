@@ -3,7 +3,9 @@ Created on Apr 26, 2021
 
 @author: salem Aguemoun
 '''
-from copy import deepcopy
+from collections import OrderedDict
+import concurrent.futures
+import operator
 
 class Factor(object):
 	"""
@@ -13,6 +15,28 @@ class Factor(object):
 	
 	.. WARNING:: to use the method power(), the object class must have implemented method __mul__()
 	
+	:var int plans_size: maximum number of factorization plans kept in cache
+	
+		**128** / 0 disables the cache
+	
+	:var OrderedDict plans: factorization plans shared by all instances, indexed by (exponent, optimize, chain)
+	
+		the least recently used plan is removed first
+	
+	:var int plans_hits: number of plans found in cache
+	:var int plans_misses: number of plans calculated
+	
+	:var int chains_exact_max: highest exponent for which the shortest addition chain is searched
+	
+		**256** / above it the sliding window chain is used
+	
+	:var dict chains: table of shortest addition chains indexed by exponent
+	
+	:var dict pools: pools of processes shared by all instances, indexed by number of processes
+	
+		created at the first call of :meth:`Factor.power` with this number and reused by the next ones,
+		see :meth:`Factor.get_pool`
+	
 	.. CAUTION:: Instance variables
 	
 	:var list exponentsof2: the exponents of 2 representing the given exponent
@@ -21,15 +45,34 @@ class Factor(object):
 	:var list factorization: factorization of exponent of 2 of product
 	:var int exponent: exponent of calculated power
 	:var bool real: if True the exponents of 2 are representing with a calculated format 2**e otherwise just e
+	:var list chain: addition chain of exponent if a chain method is given otherwise empty
+	:var tuple steps: products to calculate the power and index of the result, see :meth:`Factor.get_steps_factorization`
+	:var dict program: compiled program of products, see :meth:`Factor.get_program`
+	
+	.. WARNING:: exponentsof2, elementaries, factorization, chain, steps and program are shared with the cached plan, do not modify them
 	"""
+	plans_size = 128
+	plans = OrderedDict()
+	plans_hits = 0
+	plans_misses = 0
+	chains_exact_max = 256
+	chains = {1: [1]}
+	pools = {}
 
-	def __init__(self, exponent: int, optimize: str=''):
+	def __init__(self, exponent: int, optimize: str='', chain: str=''):
 		''' instantiate an object with the required exponent and a method of product optimization
 		
 		:param int exponent: initial exponent of product
 		:param str optimize: the method used to optimize the product: None, 'soft' or 'hard'
 		
 			default: None
+		
+		:param str chain: the method used to plan the product with an addition chain: None, 'window' or 'shortest'
+		
+			default: None, the factorization in exponent of 2 is used
+			
+			the rounding of 'soft' or 'hard' is only valid for idempotent products like closures,
+			for others products (integers, arithmetic matrices) prefer a chain
 
 		>>> factor = Factor(1)
 		>>> print(factor)
@@ -60,12 +103,47 @@ class Factor(object):
 		exponent: 4096
 		factorization: 256*16
 		count: 1
+		
+		>>> factor = Factor(2125, chain='window')
+		>>> print(factor)
+		exponent: 2125
+		chain: [1, 2, 4, 8, 16, 32, 33, 66, 132, 264, 265, 530, 531, 1062, 2124, 2125]
+		count: 15
 		'''
-		self._set_exponent(exponent, optimize)
 		self.real = True
-		self.exponentsof2 = Factor.get_exponentsof2(self.exponent)
-		self.elementaries = Factor.get_elementaries(self.exponentsof2, real=self.real)
-		self.factorization, self.count = Factor.get_factorization(self.elementaries, real=self.real)
+		plan = Factor.get_plan(exponent, optimize, chain)
+		if not plan:
+			self._set_exponent(exponent, optimize)
+			if chain:
+				exponentsof2, elementaries, factorization = [], [], []
+				chain_exponents = Factor.get_chain(self.exponent, chain)
+				count = max(len(chain_exponents) - 1, 0)
+				steps = (Factor.get_chain_steps(chain_exponents), max(len(chain_exponents) - 1, 0))
+			else:
+				exponentsof2 = Factor.get_exponentsof2(self.exponent)
+				elementaries = Factor.get_elementaries(exponentsof2, real=self.real)
+				factorization, count = Factor.get_factorization(elementaries, real=self.real)
+				chain_exponents = []
+				steps = Factor.get_steps_factorization(factorization)
+			plan = Factor.set_plan(exponent, optimize, {
+				'exponent': self.exponent,
+				'exponentsof2': exponentsof2,
+				'elementaries': elementaries,
+				'factorization': factorization,
+				'count': count,
+				'chain': chain_exponents,
+				'steps': steps,
+				'program': Factor.get_program(*steps),
+				}, chain)
+		
+		self.exponent = plan['exponent']
+		self.exponentsof2 = plan['exponentsof2']
+		self.elementaries = plan['elementaries']
+		self.factorization = plan['factorization']
+		self.count = plan['count']
+		self.chain = plan['chain']
+		self.steps = plan['steps']
+		self.program = plan['program']
 	
 	def __repr__(self):
 		"""
@@ -84,7 +162,13 @@ class Factor(object):
 		>>> factor = Factor(2125)
 		>>> repr(factor)
 		'256*2 + 16*4 + 4*(2 + 1) + 1'
+		
+		>>> factor = Factor(15, chain='shortest')
+		>>> repr(factor)
+		'[1, 2, 4, 5, 10, 15]'
 		"""
+		if self.chain:
+			return str(self.chain)
 		string = str(self.factorization)
 		d = {	': ': '*', ',': ' +', '[': '(', 	']': ')', '{': '', '}': ''}
 		for s, r in d.items():
@@ -110,6 +194,8 @@ class Factor(object):
 		>>> repr(factor)
 		'256*(16*(4 + 2 + 1) + 4*(2 + 1) + 2 + 1) + 16*(4*(2 + 1) + 2 + 1) + 4*(2 + 1) + 2 + 1'
 		"""
+		if self.chain:
+			return f"exponent: {self.exponent}\nchain: {repr(self)}\ncount: {self.count}"
 		return f"exponent: {self.exponent}\nfactorization: {repr(self)}\ncount: {self.count}"
 		
 	def operations(self) -> int:
@@ -126,99 +212,36 @@ class Factor(object):
 		>>> factor = Factor(32767)
 		>>> factor.operations()
 		28
-		"""
-		def set_bases(max_exponent: int) -> dict:
-			"""
-			Set intial bases from elementaries of the first level
-			the bases are the powers of the object found in elementaries
-			
-			:param int max_exponent: the highest exponent found in elementaries
-			
-			:return: bases
-			:rtype: dict
-			"""
-			indexes = [2**i for i in range(1, max_exponent.bit_length())]
-			bases = {1: 1}
-			for i in range(len(indexes)):
-				bases[indexes[i]] = 1
-			return bases
 		
-		def add_bases(exponent: int) -> None:
-			"""
-			Add bases to existing bases due to distribution of factorization
-			
-			:param int exponent: exponent found in distribution of factorization
-			
-			:return: bases
-			:rtype: dict
-			"""
-			exponent_loop = max(bases.keys())
-			loop = exponent.bit_length() - exponent_loop.bit_length()
-			for _ in range(loop):
-				exponent_loop *= 2
-				bases[exponent_loop] = 1
+		>>> factor = Factor(32767, chain='window')
+		>>> factor.operations()
+		20
+		"""
+		return len([i for i in self.program['instructions'] if i[0] != 'free'])
 
-		def calc(exponent, exponentsof) -> object:
-			"""
-			Calculate element by adding bases and returns the product power at the given exponent
-			
-			:param int exponent: the exponent
-			:param int exponentsof: the exponent of exponent
-			
-			:return: the power of given object at the exponent of exponent from bases
-			:rtype: object
-			"""
-			exponent_final = exponent * exponentsof
-			if exponent_final not in bases.keys():
-				add_bases(exponent_final)
-			return bases[exponent_final]
+	def power(self, obj: object, executor: object=None):
+		"""
+		Give the power of the object and the number of operations to calculate it
 		
-		def set_content(result, content, ops):
-			"""
-			Set content from result and avoid making a product of the object with an integer
-			"""
-			if content != 0:
-				content = content + result
-				ops += 1
-			else:
-				content = result
-			return (content, ops)
-			
-		def calcrec(factorization, exponent=1, ops=0):
-			"""
-			Recursive function to distribute factorization
-			"""
-			content = 0
-
-			for element in factorization:
-				if isinstance(element, dict):
-					exponent_loop, exponents = element.popitem()
-					if isinstance(exponents, int):
-						result = calc(exponent_loop, exponents)
-					else:
-						result, ops = calcrec(exponents, exponent * exponent_loop, ops)
-					content, ops = set_content(result, content, ops)
-				else:
-					result = calc(exponent, element)
-					content, ops = set_content(result, content, ops)
-			return (content, ops)
+		The compiled program of the factorization is executed,
+		see :meth:`Factor.get_program` and :meth:`Factor.execute`
 		
-		ops = 0
-		if self.factorization:
-			max_exponent = max({i for l in self.elementaries for i in l})
-			bases = set_bases(max_exponent)
-			factorization = deepcopy(self.factorization)
-			_, ops = calcrec(factorization)
-			# -1 for the first element in bases
-			ops += len(bases) - 1
-		return (ops)
-
-	def power(self, obj: object):
-		"""
-		Give the number of operations to calculate the factorized power
+		With an executor, independent products are calculated concurrently,
+		see :meth:`Factor.execute_concurrent`.
 		
-		:return: the number of operations to calculate the factorized power
-		:rtype: int
+		.. WARNING:: at most 2 products run at the same time, whatever the number of processes:
+			the chain of squares and the accumulation with a factorization, and only 1 with an addition chain
+			where each product needs the previous one. Operands are also sent to other processes,
+			so the executor is often slower than the products in the current process
+		
+		:param object obj: object to calculate the power with the method __mul__()
+		:param object executor: a :class:`concurrent.futures.Executor` or a number of processes,
+			the pool of this number is shared, see :meth:`Factor.get_pool`
+		
+			default: None, products are calculated in the current process
+		
+		:return: the power of object and the number of operations to calculate it
+		:rtype: tuple
 		
 		>>> factor = Factor(34)
 		
@@ -236,103 +259,150 @@ class Factor(object):
 		>>> factor = Factor(127)
 		>>> factor.power(2)
 		(170141183460469231731687303715884105728, 12)
+		
+		>>> factor = Factor(127, chain='shortest')
+		>>> factor.power(2)
+		(170141183460469231731687303715884105728, 10)
+		
+		>>> factor = Factor(2125, chain='window')
+		>>> factor.power(3, executor=2) == factor.power(3)
+		True
+		>>> Factor.shutdown_pools()
 		"""
-		def set_bases(obj: object, max_exponent: int):
-			"""
-			Set intial bases from elementaries of the first level
-			the bases are the powers of the object found in elementaries
-			
-			:param int max_exponent: the highest exponent found in elementaries
-			
-			:return: bases
-			:rtype: dict
-			"""
-			indexes = [2**i for i in range(1, max_exponent.bit_length())]
-			bases = {1: obj}
-			base_tmp = bases[1]
-			for i in range(len(indexes)):
-				base_tmp *= base_tmp
-				bases[indexes[i]] = base_tmp
-			return bases
-		
-		def add_bases(exponent):
-			"""
-			Add bases to existing bases due to distribution of factorization
-			
-			:param int exponent: exponent found in distribution of factorization
-			
-			:return: bases
-			:rtype: dict
-			"""
-			exponent_loop = max(bases.keys())
-			loop = exponent.bit_length() - exponent_loop.bit_length()
-			base_tmp = bases[exponent_loop]
-			for _ in range(loop):
-				base_tmp *= base_tmp
-				exponent_loop *= 2
-				bases[exponent_loop] = base_tmp
+		if not hasattr(obj, '__mul__'):
+			raise ValueError("The given object has no method for multiplication")
+		
+		if not obj:
+			return (None, 0)
+		if executor is None:
+			return Factor.execute(self.program, obj)
+		if isinstance(executor, int):
+			executor = Factor.get_pool(executor)
+		return Factor.execute_concurrent(*self.steps, obj, executor)
 
-		def calc(exponent, exponentsof):
-			"""
-			Calculate element by adding bases and returns the product power at the given exponent
-			
-			:param int exponent: the exponent
-			:param int exponentsof: the exponent of exponent
-			
-			:return: the power of given object at the exponent of exponent from bases
-			:rtype: object
-			"""
-			exponent_final = exponent * exponentsof
-			if exponent_final not in bases.keys():
-				add_bases(exponent_final)
-			return bases[exponent_final]
+	@staticmethod
+	def get_pool(workers: int) -> 'concurrent.futures.ProcessPoolExecutor':
+		"""
+		Return the shared pool of processes with this number of processes, created at the first call
 		
-		def set_content(result, content, ops):
-			"""
-			Set content from result and avoid making a product of the object with an integer
-			"""
-			if content != 1:
-				content = content * result
+		Starting processes costs more than most powers, so pools are kept for the next calls
+		until :meth:`Factor.shutdown_pools`
+		
+		:param int workers: number of processes
+		
+		:return: the pool of processes
+		:rtype: concurrent.futures.ProcessPoolExecutor
+		
+		>>> Factor.get_pool(2) is Factor.get_pool(2)
+		True
+		>>> Factor.shutdown_pools()
+		"""
+		if workers < 1:
+			raise ValueError("The number of processes must be positive")
+		if workers not in Factor.pools:
+			Factor.pools[workers] = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+		return Factor.pools[workers]
+
+	@staticmethod
+	def shutdown_pools() -> None:
+		"""
+		Stop the processes of the shared pools, see :meth:`Factor.get_pool`
+		"""
+		while Factor.pools:
+			_, pool = Factor.pools.popitem()
+			pool.shutdown()
+
+	@staticmethod
+	def execute(program: dict, obj: object) -> tuple:
+		"""
+		Run the compiled program on the object
+		
+		Slots are released as soon as they are not used anymore
+		
+		:param dict program: compiled program, see :meth:`Factor.get_program`
+		:param object obj: object to calculate the power with the method __mul__()
+		
+		:return: the power of object and the number of operations to calculate it
+		:rtype: tuple
+		
+		>>> program = Factor.get_program(Factor.get_chain_steps([1, 2, 3, 6]), 3)
+		>>> Factor.execute(program, 5)
+		(15625, 3)
+		"""
+		ops = 0
+		slots = [None] * program['slots']
+		slots[0] = obj
+		for instruction in program['instructions']:
+			if instruction[0] == 'square':
+				_, dst, src = instruction
+				slots[dst] = slots[src] * slots[src]
+				ops += 1
+			elif instruction[0] == 'multiply':
+				_, dst, src1, src2 = instruction
+				slots[dst] = slots[src1] * slots[src2]
 				ops += 1
 			else:
-				content = result
-			return (content, ops)
-			
-		def calcrec(factorization, exponent=1, ops=0):
+				slots[instruction[1]] = None
+		return (slots[program['result']], ops)
+
+	@staticmethod
+	def execute_concurrent(steps: list, result: int, obj: object, executor: 'concurrent.futures.Executor') -> tuple:
+		"""
+		Calculate the products with the executor, each product is submitted
+		as soon as its operands are calculated
+		
+		The chain of squares and the accumulation of the product are independent branches
+		and run at the same time, so at most 2 products are in flight and other workers stay idle.
+		The products of an addition chain depend each on the previous one and run one by one.
+		Operands are sent to the processes with pickle, see :meth:`MatrixBinary.__getstate__`
+		for a compact form of binary matrices
+		
+		:param list steps: couples of indexes of values to multiply, see :meth:`Factor.get_steps_factorization`
+		:param int result: index of the value of the power
+		:param object obj: object to calculate the power with the method __mul__()
+		:param concurrent.futures.Executor executor: executor of products
+		
+		:return: the power of object and the number of operations to calculate it
+		:rtype: tuple
+		
+		>>> with concurrent.futures.ThreadPoolExecutor(2) as pool:
+		... 	Factor.execute_concurrent(*Factor(13).steps, 2, pool)
+		(8192, 5)
+		"""
+		values = {0: obj}
+		uses = {result: 1}
+		dependents = {}
+		for k, (i, j) in enumerate(steps, 1):
+			for value in (i, j):
+				uses[value] = uses.get(value, 0) + 1
+				dependents.setdefault(value, []).append(k)
+		
+		def submit(k: int) -> None:
 			"""
-			Recursive function to distribute factorization
+			Submit the product of step k if all its operands are calculated
 			"""
-			content = 1
-			
-			for element in factorization:
-				if isinstance(element, dict):
-					exponent_loop, exponents = element.popitem()
-					if isinstance(exponents, int):
-						result = calc(exponent_loop, exponents)
-					else:
-						result, ops = calcrec(exponents, exponent * exponent_loop, ops)
-					content, ops = set_content(result, content, ops)
-				else:
-					result = calc(exponent, element)
-					content, ops = set_content(result, content, ops)
-			return (content, ops)
-		
-		if not hasattr(obj, '__mul__'):
-			raise ValueError("The given object has no method for multiplication")
-		
-		ops = 0
-		if obj and self.factorization:
-			max_exponent = max({i for l in self.elementaries for i in l})
-			bases = set_bases(obj, max_exponent)
-			factorization = deepcopy(self.factorization)
-			result, ops = calcrec(factorization)
-			# -1 for the first element in bases
-			ops += len(bases) - 1
-		elif obj and not self.factorization:
-			result = obj
-		else:
-			result = None
-		return (result, ops)
+			i, j = steps[k - 1]
+			if k not in submitted and i in values and j in values:
+				futures[executor.submit(operator.mul, values[i], values[j])] = k
+				submitted.add(k)
+		
+		futures = {}
+		submitted = set()
+		for k in dependents.get(0, ()):
+			submit(k)
+		while futures:
+			done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+			for future in done:
+				k = futures.pop(future)
+				values[k] = future.result()
+				# release operands after their last use
+				for value in steps[k - 1]:
+					uses[value] -= 1
+					if not uses[value]:
+						del values[value]
+				for dependent in set(dependents.get(k, ())):
+					submit(dependent)
+		return (values[result], len(steps))
 
 	@staticmethod
 	def get_bases(number: int) -> list:
@@ -353,6 +423,181 @@ class Factor(object):
 		length = len(Factor.get_int2list(number))
 		return [2**i for i in range(1, length)]
 
+	@staticmethod
+	def get_chain(number: int, method: str='shortest') -> list:
+		"""
+		Give an addition chain for the number with the given method
+		
+		:param int number: a integer
+		:param str method: the method used to find the chain: 'window' or 'shortest'
+		
+			'shortest' searches the shortest chain until :attr:`Factor.chains_exact_max`
+			and uses a sliding window chain above
+		
+		:return: addition chain starting by 1 and ending by the number
+		:rtype: list
+		
+		>>> Factor.get_chain(23)
+		[1, 2, 4, 5, 9, 18, 23]
+		
+		>>> Factor.get_chain(23, 'window')
+		[1, 2, 3, 5, 10, 20, 23]
+		"""
+		if method == 'shortest':
+			if number <= Factor.chains_exact_max:
+				return Factor.get_chain_shortest(number)
+			return Factor.get_chain_window(number)
+		elif method == 'window':
+			return Factor.get_chain_window(number)
+		raise ValueError(f"Wrong method for addition chain: {method}")
+
+	@staticmethod
+	def get_chain_shortest(number: int) -> list:
+		"""
+		Give the shortest addition chain for the number
+		
+		Search by iterative deepening of star chains (each element uses the previous one),
+		which are the shortest ones for numbers less than 12509.
+		Found chains are kept in the table :attr:`Factor.chains`
+		
+		:param int number: a integer
+		
+		:return: the shortest addition chain starting by 1 and ending by the number
+		:rtype: list
+		
+		>>> Factor.get_chain_shortest(1)
+		[1]
+		
+		>>> Factor.get_chain_shortest(71)
+		[1, 2, 4, 8, 16, 32, 64, 68, 70, 71]
+		"""
+		def search(chain: list, depth: int) -> bool:
+			"""
+			Extend in place the chain with the given number of elements until the number
+			"""
+			last = chain[-1]
+			if last == number:
+				return True
+			# can not reach the number even by doubling
+			if depth == 0 or last << depth < number:
+				return False
+			tried = set()
+			for element in reversed(chain):
+				exponent = last + element
+				if exponent <= number and exponent not in tried:
+					tried.add(exponent)
+					chain.append(exponent)
+					if search(chain, depth - 1):
+						return True
+					chain.pop()
+			return False
+		
+		if number < 1:
+			return []
+		if number not in Factor.chains:
+			depth = (number - 1).bit_length()
+			chain = [1]
+			while not search(chain, depth):
+				depth += 1
+			Factor.chains[number] = chain
+		return Factor.chains[number][:]
+
+	@staticmethod
+	def get_chain_steps(chain: list) -> list:
+		"""
+		Give for each element of the chain the indexes of the 2 previous elements which sum it
+		
+		:param list chain: addition chain starting by 1
+		
+		:return: couples of indexes in chain, starting from the second element of chain
+		:rtype: list
+		
+		>>> Factor.get_chain_steps([1, 2, 3, 6, 12, 15])
+		[(0, 0), (1, 0), (2, 2), (3, 3), (4, 2)]
+		"""
+		indexes = {}
+		steps = []
+		for k, exponent in enumerate(chain):
+			if k:
+				for i in range(k - 1, -1, -1):
+					j = indexes.get(exponent - chain[i])
+					if j is not None:
+						steps.append((i, j))
+						break
+				else:
+					raise ValueError(f"Wrong addition chain for the element: {exponent}")
+			indexes[exponent] = k
+		return steps
+
+	@staticmethod
+	def get_chain_window(number: int, width: int=0) -> list:
+		"""
+		Give an addition chain for the number with the sliding window method
+		
+		The odd powers until the highest window are precalculated,
+		then the binary representation is read from left to right by windows
+		beginning and ending by a 1
+		
+		:param int number: a integer
+		:param int width: maximal width of windows, if 0 the width giving the shortest chain is chosen
+		
+		:return: addition chain starting by 1 and ending by the number
+		:rtype: list
+		
+		>>> Factor.get_chain_window(1023)
+		[1, 2, 3, 6, 12, 15, 30, 60, 63, 126, 252, 255, 510, 1020, 1023]
+		
+		>>> Factor.get_chain_window(1023, 1)
+		[1, 2, 3, 6, 7, 14, 15, 30, 31, 62, 63, 126, 127, 254, 255, 510, 511, 1022, 1023]
+		"""
+		def add(exponent: int) -> None:
+			"""
+			Add the exponent to chain if not present
+			"""
+			if exponent not in chain_set:
+				chain.append(exponent)
+				chain_set.add(exponent)
+		
+		if number < 1:
+			return []
+		if not width:
+			chains = [Factor.get_chain_window(number, width) for width in range(1, 6)]
+			return min(chains, key=len)
+		
+		# windows in (value, length)
+		binary = bin(number)[2:]
+		windows = []
+		i = 0
+		while i < len(binary):
+			if binary[i] == '0':
+				windows.append((0, 1))
+				i += 1
+			else:
+				j = min(i + width, len(binary))
+				while binary[j - 1] == '0':
+					j -= 1
+				windows.append((int(binary[i:j], 2), j - i))
+				i = j
+		
+		# odd powers
+		chain = [1]
+		chain_set = {1}
+		value_max = max(value for value, _ in windows)
+		if value_max > 1:
+			add(2)
+			for value in range(3, value_max + 1, 2):
+				add(value)
+		
+		exponent = windows[0][0]
+		for value, length in windows[1:]:
+			for _ in range(length):
+				exponent *= 2
+				add(exponent)
+			if value:
+				exponent += value
+				add(exponent)
+		return chain
+
 	@staticmethod
 	def get_elementaries(exponentsof2: iter, real: bool=False) -> list:
 		"""
@@ -379,6 +624,63 @@ class Factor(object):
 			elementaries = [{2**i for i in s} for s in elementaries]
 		return elementaries 
 		
+	@staticmethod
+	def get_steps_factorization(factorization: list) -> tuple:
+		"""
+		Give the products to calculate the power represented by the factorization
+		
+		The powers of 2 of the object are calculated by squares in increasing order,
+		each one is multiplied to the accumulated product as soon as it is calculated
+		
+		:param list factorization: factorization of exponent of 2 of product
+		
+		:return: couples of indexes of values to multiply and the index of the value of the power,
+			the value 0 is the object and the value k is the result of the k-th step
+		:rtype: tuple
+		
+		>>> Factor.get_steps_factorization(Factor(13).factorization)
+		([(0, 0), (1, 1), (0, 2), (2, 2), (3, 4)], 5)
+		"""
+		steps = []
+		base = 0
+		exponent = 1
+		result = None
+		for term in sorted(Factor.get_terms(factorization)):
+			while exponent < term:
+				steps.append((base, base))
+				base = len(steps)
+				exponent *= 2
+			if result is None:
+				result = base
+			else:
+				steps.append((result, base))
+				result = len(steps)
+		return (steps, result if result is not None else 0)
+
+	@staticmethod
+	def get_terms(factorization: list, exponent: int=1) -> iter:
+		"""
+		Give the exponents of 2 to multiply to calculate the power represented by the factorization
+		
+		:param list factorization: factorization of exponent of 2 of product
+		:param int exponent: exponent of the level of factorization
+		
+		:return: exponents of 2
+		:rtype: generator
+		
+		>>> list(Factor.get_terms(Factor(242).factorization))
+		[128, 64, 32, 16, 2]
+		"""
+		for element in factorization:
+			if isinstance(element, dict):
+				for exponent_loop, exponents in element.items():
+					if isinstance(exponents, int):
+						yield exponent_loop * exponents
+					else:
+						yield from Factor.get_terms(exponents, exponent * exponent_loop)
+			else:
+				yield exponent * element
+
 	@staticmethod
 	def get_exponentsof2(number: int) -> list:
 		"""
@@ -486,6 +788,91 @@ class Factor(object):
 		"""
 		return list(bin(number)[2:])
 
+	@staticmethod
+	def get_plan(exponent: int, optimize: str='', chain: str='') -> dict:
+		"""
+		Give the cached factorization plan of the exponent for the optimization
+		and mark it as the most recently used
+		
+		:param int exponent: initial exponent of product
+		:param str optimize: the method used to optimize the product: None, 'soft' or 'hard'
+		:param str chain: the method used to plan the product with an addition chain: None, 'window' or 'shortest'
+		
+		:return: the plan or None if it is not in cache
+		:rtype: dict
+		
+		>>> Factor.plans_clear()
+		>>> Factor.get_plan(2125, 'soft')
+		>>> factor = Factor(2125, optimize='soft')
+		>>> Factor.get_plan(2125, 'soft')['factorization']
+		[{256: 2}, {16: 2}]
+		"""
+		key = (exponent, optimize, chain)
+		if key in Factor.plans:
+			Factor.plans_hits += 1
+			Factor.plans.move_to_end(key)
+			return Factor.plans[key]
+		Factor.plans_misses += 1
+		return None
+
+	@staticmethod
+	def get_program(steps: list, result: int) -> dict:
+		"""
+		Compile the products in a straight-line program of instructions on slots
+		
+		Each value of the product is kept in a slot only during its live range:
+		the slot is freed after its last use and reused by the next products
+		
+		:param list steps: couples of indexes of values to multiply,
+			the value 0 is the object and the value k is the result of the k-th step
+		:param int result: index of the value of the power
+		
+		:return: the program
+		:rtype: dict
+		
+			:instructions: (list) instructions in tuples:
+			
+				* ('square', slot destination, slot)
+				* ('multiply', slot destination, slot, slot)
+				* ('free', slot)
+				
+			:result: (int) slot of the power at the end of program
+			:slots: (int) number of slots needed, the slot 0 contains the object at start
+		
+		>>> Factor.get_program([(0, 0), (1, 1), (2, 0)], 3)
+		{'instructions': [('square', 1, 0), ('square', 2, 1), ('free', 1), ('multiply', 1, 2, 0), ('free', 0), ('free', 2)], 'result': 1, 'slots': 3}
+		"""
+		uses_last = {result: len(steps) + 1}
+		for k, (i, j) in enumerate(steps, 1):
+			uses_last[i] = max(uses_last.get(i, 0), k)
+			uses_last[j] = max(uses_last.get(j, 0), k)
+		
+		instructions = []
+		slots_value = {0: 0}
+		slots_free = []
+		slots = 1
+		for k, (i, j) in enumerate(steps, 1):
+			if slots_free:
+				slot = slots_free.pop()
+			else:
+				slot = slots
+				slots += 1
+			if i == j:
+				instructions.append(('square', slot, slots_value[i]))
+			else:
+				instructions.append(('multiply', slot, slots_value[i], slots_value[j]))
+			slots_value[k] = slot
+			# free operands after their last use and unused products
+			for value in sorted({i, j, k}):
+				if uses_last.get(value, k) == k:
+					instructions.append(('free', slots_value[value]))
+					slots_free.append(slots_value.pop(value))
+		return {
+			'instructions': instructions,
+			'result': slots_value[result],
+			'slots': slots,
+			}
+
 	@staticmethod
 	def get_power(number: int) -> set:
 		"""
@@ -510,6 +897,66 @@ class Factor(object):
 		p = {2**i for i,n in enumerate(n) if n =='1'}
 		return p if p else {0}
 
+	@staticmethod
+	def plans_clear() -> None:
+		"""
+		Remove all plans from cache and reset its counters
+		
+		>>> factor = Factor(242)
+		>>> Factor.plans_clear()
+		>>> Factor.plans_info()
+		{'hits': 0, 'misses': 0, 'length': 0, 'size': 128}
+		"""
+		Factor.plans.clear()
+		Factor.plans_hits = 0
+		Factor.plans_misses = 0
+
+	@staticmethod
+	def plans_info() -> dict:
+		"""
+		Give the usage of the cache of plans
+		
+		:return: cache usage
+		:rtype: dict
+		
+			:hits: (int) number of plans found in cache
+			:misses: (int) number of plans calculated
+			:length: (int) number of plans in cache
+			:size: (int) maximum number of plans in cache
+		
+		>>> Factor.plans_clear()
+		>>> for _ in range(3):
+		... 	factor = Factor(999, optimize='hard')
+		>>> Factor.plans_info()
+		{'hits': 2, 'misses': 1, 'length': 1, 'size': 128}
+		"""
+		return {
+			'hits': Factor.plans_hits,
+			'misses': Factor.plans_misses,
+			'length': len(Factor.plans),
+			'size': Factor.plans_size,
+			}
+
+	@staticmethod
+	def set_plan(exponent: int, optimize: str, plan: dict, chain: str='') -> dict:
+		"""
+		Put the factorization plan in cache and remove the least recently used ones
+		when the cache is full
+		
+		:param int exponent: initial exponent of product
+		:param str optimize: the method used to optimize the product: None, 'soft' or 'hard'
+		:param dict plan: plan of factorization
+		:param str chain: the method used to plan the product with an addition chain: None, 'window' or 'shortest'
+		
+		:return: the plan
+		:rtype: dict
+		"""
+		if Factor.plans_size > 0:
+			Factor.plans[(exponent, optimize, chain)] = plan
+			while len(Factor.plans) > Factor.plans_size:
+				Factor.plans.popitem(last=False)
+		return plan
+
 	def _set_exponent(self, exponent: int, optimize: str) -> None:
 		"""
 		Set the exponent according to the chosen optimization
@@ -3,9 +3,12 @@ Created on Apr 26, 2021
 
 @author: salem Aguemoun
 '''
-import pygraphviz
+import itertools
+import math
+import graphm.dotwriter
 import graphm.matrixbinary
 import graphm.matrixboolean
+DotWriter = graphm.dotwriter.DotWriter
 MatrixBinary = graphm.matrixbinary.MatrixBinary
 MatrixBoolean = graphm.matrixboolean.MatrixBoolean
 
@@ -27,10 +30,19 @@ class Graph(object):
 			
 			**dot** / neato, dot, twopi, circo, fdp, nop
 
+	:var RenderCache render_cache: cache of drawings used by :meth:`Graph.draw`, see :class:`graphm.rendercache.RenderCache`
+	
+		**None** / drawings are not cached
+	
 	:var str sep: default separator for elements in string like optionally for node, edges
 	
 		**,**
 	
+	:var float update_ratio: maximum ratio of changed edges to the edges of the graph
+		to apply only the changes to the viz, over it the viz is loaded at once, see :meth:`Graph.update_viz`
+	
+		**0.15**
+	
 	:var dict graph_attr: default attributes for graph, see :class:`pygraphviz.Agraph`
 	
 		:directed: (bool) directed graph or not
@@ -58,16 +70,24 @@ class Graph(object):
 
 	:var dict layout: graph layout, see :class:`Graph.layout`
 
+	:var dict condensation: components drawn by :meth:`Graph.set_from_condensed`, see :meth:`MatrixBinary.get_condensation`
+
+	:var list viz_nodes: names of nodes by index of the matrix loaded in viz, None if the viz is not loaded from a matrix
+	:var list viz_matrixM: binary rows of the edges loaded in viz
+	:var dict viz_labels: labels of edges loaded in viz indexed by (m, n), None if edges have no labels
+
 	**Graph for the majority of examples** 
 	
 	.. IMAGE:: files/graph_draw2.svg
 	
 	"""
 	node_style = 'str'
+	render_cache = None
 	layout = {
 		'prog' : 'dot',
 		}
 	sep = ','
+	update_ratio = 0.15
 	graph_attr = {
 		'label' : 'G',
 		'directed' : True,
@@ -95,6 +115,7 @@ class Graph(object):
 		 		| **matrix** get a matrix (None is default value)
 		 		| **boolean** get a boolean matrix
 				| **binary** get a binary matrixM and dimN
+				| **condensed** get a binary matrixM drawn by its strongly connected components
 		
 			* classical
 						
@@ -106,6 +127,7 @@ class Graph(object):
 			:matrix: (list[int]) matrix in [str, ...] or [[int,...], ...] or (str, ...) or ((int,...), ...)
 			:boolean: (list[int]) matrix in [str, ...] or [[int,...], ...] or (str, ...) or ((int,...), ...) or class MatrixBoolean
 			:binary: matrixM in [int, ...] or class MatrixBinary
+			:condensed: matrixM in [int, ...] or class MatrixBinary, see :meth:`Graph.set_from_condensed`
 			:edges: (tuple/list) list of edges in tuple format (nodeIn, nodeOut)
 			:nodes: (tuple/list) optional list of nodes
 			:sep: (str) separator for elements in string like optionally for node, edges,  see :class:`Graph.sep`
@@ -143,12 +165,15 @@ class Graph(object):
 		#self.layout = Graph.layout.copy()
 		#self.sep = d['sep'] if 'sep' in d else Graph.sep
 		
+		# matrix loaded in viz, to update only its changes
+		self.reset_viz_matrix()
+		
 		# viz
 		self.set_viz(**d)
 
 		# call the good method to initialize object
 		initialized = False
-		for attr in ('matrix', 'boolean', 'binary', 'pert'):
+		for attr in ('matrix', 'boolean', 'binary', 'condensed', 'pert'):
 			if attr in d:
 				self._call_init(f"set_from_{attr}", **d)
 				initialized = True
@@ -210,13 +235,7 @@ class Graph(object):
 			#. generated by self.generate_nodes()
 		
 			:param bool cut=False: if True reduce the number of nodes to the dimension of the graph
-			:param dict \*\*d: options to specify arguments to :class:`pygraphviz.AGraph`
-		
-				:nodes: (iter(str)) names of nodes
-				:dim: (int) number of nodes (needed if nodes are empty)
-				:node_style: (str) node name generation style: 'str' or 'int' 
-						
-					default: :class:`Graph.node_style`
+			:param dict \*\*d: options to specify arguments to :class:`pygraphviz.AGraph`, see :meth:`Graph.get_nodes`
 		
 		:return: nodes generated after settings
 		:rtype: list
@@ -225,29 +244,16 @@ class Graph(object):
 		>>> g.viz.nodes()
 		['A', 'B', 'C', 'D', 'E']
 
-		>>> g.set_nodes(nodes='UU,V,X,Y,Z,T')
+		>>> g.add_nodes(nodes='UU,V')
+		['UU', 'V']
 		>>> g.viz.nodes()
-		['UU', 'V', 'X', 'Y', 'Z', 'T']
+		['A', 'B', 'C', 'D', 'E', 'UU', 'V']
 		"""
-		if 'nodes' in d:
-			nodes = self.convert_nodes(d['nodes'])
-			
-			# for matrix, need to have enough nodes
-			if cut:
-				if not 'dim' in d:
-					raise ValueError("Missing index 'dim' in dictionary of arguments")
-				dim = d['dim']
-				if len(nodes) < dim:
-					raise ValueError(f"The number of names: {len(nodes)} is less than the number of nodes: {dim}")
-			
-			# cut nodes to graph dimension
-			if cut:
-				nodes = nodes[:dim]
-		else:
-			nodes = self.generate_nodes(**d)
+		nodes = self.get_nodes(cut, **d)
 
 		# add to viz
 		self.viz.add_nodes_from(nodes)
+		self.reset_viz_matrix()
 		
 		return nodes
 
@@ -314,6 +320,10 @@ class Graph(object):
 		
 		:param dict \*\*d: options to specify the type of matrix
 		
+			:cache: (RenderCache) cache of drawings, None to draw without cache
+			
+				default: :attr:`Graph.render_cache`
+			
 			for **viz**
 			
 			:label='G': (str) label for the graph
@@ -368,9 +378,25 @@ class Graph(object):
 		# viz
 		self.update_attrs(**d)
 		
-		# draw
-		self.viz.layout(**self.layout)
-		self.viz.draw(path, ext)
+		# draw, or get the drawing from cache
+		cache = d['cache'] if 'cache' in d else self.render_cache
+		if cache is not None:
+			cache.draw(self.viz, path, ext, self.layout)
+		else:
+			self.viz.layout(**self.layout)
+			self.viz.draw(path, ext)
+
+	def draw_dot(self, binary: iter, path: str="files/tmp.png", ext: str='png', **d) -> None:
+		""" Draw the graph of a binary matrix to a file without viz,
+		the graph is streamed to the layout program running in another process
+		
+		:param iter binary: binary square matrix containing matrixM in format [int, ...] or class MatrixBinary
+		:param str path=files/tmp.png: path to write the file
+		:param str ext='png': format of the file
+		:param dict \*\*d: options for nodes, see :meth:`Graph.write_dot`
+		"""
+		with DotWriter.open_layout(path, ext, self.layout['prog'], graph_attr=self.graph_attr, node_attr=self.node_attr, edge_attr=self.edge_attr) as writer:
+			self.write_dot(writer, binary, **d)
 
 	def generate_nodes(self, dim: int, **d) -> list:
 		""" Return nodes names generating with the type given
@@ -418,6 +444,95 @@ class Graph(object):
 
 		return nodes
 		
+	@staticmethod
+	def get_boolean_rows(boolean: iter) -> list:
+		""" Return the binary rows of a boolean matrix
+		
+		:param iter boolean: boolean square matrix in formats [str, ...] or [[int,...], ...] or (str, ...) or ((int,...), ...)
+		
+		:return: rows in integers, see :class:`MatrixBinary`
+		:rtype: list
+		
+		>>> Graph.get_boolean_rows(['001', [1, 0, 0], ('0', '1', '1')])
+		[1, 4, 3]
+		"""
+		return [MatrixBinary.get_str2int(''.join('0' if str(value) == '0' else '1' for value in line)) for line in boolean]
+
+	@staticmethod
+	def get_matrix_rows(matrix: iter) -> tuple:
+		""" Return the binary rows and the labels of edges of a common matrix
+		
+		:param iter matrix: square matrix in formats [[int,...], ...] or ((int,...), ...), None for no edge
+		
+		:return: rows in integers, see :class:`MatrixBinary`, and labels indexed by edge (m, n)
+		:rtype: tuple(list, dict)
+		
+		>>> Graph.get_matrix_rows([[None, 2], [5, None]])
+		([1, 2], {(0, 1): 2, (1, 0): 5})
+		"""
+		dim = len(matrix)
+		labels = {(m, n): value for m, line in enumerate(matrix) for n, value in enumerate(line) if value != None}
+		rows = [0] * dim
+		for m, n in labels:
+			rows[m] |= 1 << (dim - n - 1)
+		return rows, labels
+
+	@staticmethod
+	def get_viz_nodes(viz: 'pygraphviz.AGraph') -> list:
+		""" Return the nodes of the viz with their own attributes, to load them again, see :meth:`Graph.load_viz`
+		
+		:param pygraphviz.AGraph viz: the graph
+		
+		:return: nodes in tuples (name, attributes)
+		:rtype: list
+		
+		>>> g = Graph(boolean=['01', '00'])
+		>>> g.viz.get_node('A').attr['color'] = 'red'
+		>>> Graph.get_viz_nodes(g.viz)
+		[('A', {'color': 'red'}), ('B', {})]
+		"""
+		return [(str(node), dict(node.attr)) for node in viz.iternodes()]
+
+	def get_nodes(self, cut :bool=False, **d) -> list:
+		""" Return nodes:
+			#. given in argument
+			#. generated by self.generate_nodes()
+		
+			:param bool cut=False: if True reduce the number of nodes to the dimension of the graph
+			:param dict \*\*d: options to specify arguments to :class:`pygraphviz.AGraph`
+		
+				:nodes: (iter(str)) names of nodes
+				:dim: (int) number of nodes (needed if nodes are empty)
+				:node_style: (str) node name generation style: 'str' or 'int' 
+						
+					default: :class:`Graph.node_style`
+		
+		:return: nodes generated after settings
+		:rtype: list
+
+		>>> g = Graph()
+		>>> g.get_nodes(nodes='UU,V,X,Y,Z,T', dim=3, cut=True)
+		['UU', 'V', 'X']
+		"""
+		if 'nodes' in d:
+			nodes = self.convert_nodes(d['nodes'])
+			
+			# for matrix, need to have enough nodes
+			if cut:
+				if not 'dim' in d:
+					raise ValueError("Missing index 'dim' in dictionary of arguments")
+				dim = d['dim']
+				if len(nodes) < dim:
+					raise ValueError(f"The number of names: {len(nodes)} is less than the number of nodes: {dim}")
+			
+			# cut nodes to graph dimension
+			if cut:
+				nodes = nodes[:dim]
+		else:
+			nodes = self.generate_nodes(**d)
+
+		return nodes
+
 	def init_attrs(self) -> None:
 		""" Set default viz attributes to drawing with default class attributes for viz
 		
@@ -441,29 +556,99 @@ class Graph(object):
 			attr_viz = getattr(self.viz, attr_name)
 			attr_viz.update(attr)
 
+	@staticmethod
+	def load_viz(viz: 'pygraphviz.AGraph', nodes: iter, edges: iter) -> None:
+		""" Replace nodes and edges of the viz by reading once a source in DOT format
+		
+		Attributes of the graph and default attributes of nodes and edges are kept.
+		Avoid one call to Graphviz for each node and edge, which is slow for large graphs
+		
+		:param pygraphviz.AGraph viz: the viz to load
+		:param iter nodes: names of nodes, or tuples (name, attributes)
+		:param iter edges: edges in tuple (u, v) or (u, v, label) or (u, v, attributes)
+
+		>>> g = Graph(boolean=['01', '00'])
+		>>> Graph.load_viz(g.viz, ['A', 'B', 'C'], [('A', 'C', 'x'), ('C', 'B')])
+		>>> print(g)
+		nodes=3 edges=2
+		nodes A B C
+		edges A-C C-B
+		>>> g.viz.get_edge('A', 'C').attr['label']
+		'x'
+		"""
+		quote = DotWriter.quote
+		attrs = DotWriter.get_attrs
+
+		arrow = ' -> ' if viz.directed else ' -- '
+		lines = [
+			f"{'strict ' if viz.strict else ''}{'digraph' if viz.directed else 'graph'} {quote(viz.name or '')} {{",
+			f"graph [{attrs(viz.graph_attr)}];",
+			f"node [{attrs(viz.node_attr)}];",
+			f"edge [{attrs(viz.edge_attr)}];",
+			]
+		for node in nodes:
+			name, attr = node if isinstance(node, tuple) else (node, None)
+			lines.append(f"{quote(name)} [{attrs(attr)}];" if attr else quote(name) + ';')
+		for edge in edges:
+			if len(edge) > 2 and isinstance(edge[2], dict):
+				lines.append(f"{quote(edge[0])}{arrow}{quote(edge[1])} [{attrs(edge[2])}];")
+			elif len(edge) > 2 and edge[2] not in (None, ''):
+				lines.append(f"{quote(edge[0])}{arrow}{quote(edge[1])} [label={quote(edge[2])}];")
+			else:
+				lines.append(f"{quote(edge[0])}{arrow}{quote(edge[1])};")
+		lines.append('}')
+		viz.from_string('\n'.join(lines))
+
 	def reset_edges(self, **d) -> None:
 		""" remove all edges in viz
 		"""
 		# remove existing nodes
 		self.viz.remove_edges_from(self.viz.edges())
+		self.reset_viz_matrix()
 		
 	def reset_nodes(self, **d) -> None:
 		""" remove all nodes in viz
 		"""
 		# remove existing nodes
 		self.viz.remove_nodes_from(self.viz.nodes())
+		self.reset_viz_matrix()
+
+	def reset_viz_matrix(self) -> None:
+		""" Forget the matrix loaded in viz, the next update loads the viz at once
+		
+		Called by every method changing the viz without a matrix, see :meth:`Graph.update_viz`
+		"""
+		self.viz_nodes = None
+		self.viz_matrixM = None
+		self.viz_labels = None
 
 	def set_edges(self, **d) -> None:
-		""" Add edges to viz from:
+		""" Replace edges of viz by the edges given, nodes are kept
+		
+		The viz is loaded at once, see :meth:`Graph.load_viz`
+		
+		:param dict \*\*d: containing edges
+		
+			:edges: (iter) edges of graph, see :meth:`Graph.convert_edges`
+		
+		>>> g = Graph(boolean=['01', '00'])
+		>>> g.viz.get_node('A').attr['color'] = 'red'
+		>>> g.set_edges(edges=[('B', 'A')])
+		>>> g.viz.edges(), g.viz.get_node('A').attr['color']
+		([('B', 'A')], 'red')
 		"""
-		self.reset_edges(**d)
-		self.add_edges(**d)
+		Graph.load_viz(self.viz, Graph.get_viz_nodes(self.viz), self.convert_edges(d['edges']) if 'edges' in d else [])
+		self.reset_viz_matrix()
 
 	def set_nodes(self, **d) -> None:
-		""" Set nodes to viz from:
+		""" Replace nodes of viz by the nodes given, existing edges are removed
+		
+		The viz is loaded at once, see :meth:`Graph.load_viz`
+		
+		:param dict \*\*d: options to get nodes, see :meth:`Graph.get_nodes`
 		"""
-		self.reset_nodes(**d)
-		self.add_nodes(**d)
+		Graph.load_viz(self.viz, self.get_nodes(**d), [])
+		self.reset_viz_matrix()
 
 	def set_from_binary(self, binary: iter, **d) -> None:
 		""" Set viz graph from binary matrix and nodes if given
@@ -495,13 +680,72 @@ class Graph(object):
 			raise ValueError("Wrong empty matrix")
 
 		dim = len(matrix)
-		self.set_nodes(dim=dim, cut=True, **d)
-		nodes = self.viz.nodes()
+		nodes = self.get_nodes(dim=dim, cut=True, **d)
 
-		matrixS = [MatrixBinary.get_int2str(line, dim) for line in matrix]
-		edges = [(nodes[m], nodes[n]) for m in range(dim) for n in range(dim) if matrixS[m][n] == '1']
+		edges = [(nodes[m], nodes[n]) for m, n in MatrixBinary.iter_edges(matrix, dim)]
 		
-		self.set_edges(edges=edges)
+		Graph.load_viz(self.viz, nodes, edges)
+		self.viz_nodes, self.viz_matrixM, self.viz_labels = nodes, list(matrix), None
+
+	def set_from_condensed(self, condensed: iter, **d) -> None:
+		""" Set viz graph from the strongly connected components of a binary matrix
+		
+		Each component is drawn as one node sized by its number of nodes, edges are drawn
+		once between components with a width given by the number of edges they replace,
+		see :meth:`graphm.matrixbinary.MatrixBinary.get_condensation`.
+		Only the transitive reduction is drawn, so the layout depends on the condensed graph only
+		
+		:param iter condensed: binary square matrix containing matrixM in format [int, ...] or class MatrixBinary
+		:param dict \*\*d: containing optionally nodes, node_style
+		
+			:reduce: (bool) draw only the transitive reduction of the components, default = True
+			:chains: (bool) merge chains of components in one node, default = False
+			:nodes: (iter(str)) names of nodes
+			:node_style: (str) node name generation style: 'str' or 'int' 
+						
+				default: :class:`Graph.node_style`
+		
+		>>> g = Graph()
+		>>> g.set_from_condensed([0b0110, 0b1001, 0b0001, 0b0000])
+		>>> print(g)
+		nodes=3 edges=2
+		nodes A +1 C D
+		edges A +1-C C-D
+		>>> g.viz.get_node('A +1').attr['width'], g.viz.get_edge('A +1', 'C').attr['penwidth']
+		('1.06', '2.0')
+		>>> g.condensation['components']
+		[[0, 1], [2], [3]]
+		"""
+		if isinstance(condensed, MatrixBinary):
+			matrix = condensed
+		else:
+			if not condensed:
+				raise ValueError("Wrong empty matrix")
+			matrix = MatrixBinary(matrix=(list(condensed), len(condensed)))
+
+		dim = matrix.dimM
+		nodes = self.get_nodes(dim=dim, cut=True, **d)
+		self.condensation = matrix.get_condensation(reduce=d.get('reduce', True), chains=d.get('chains', False))
+
+		# a component is named by its first node and the number of the other ones
+		components = []
+		for members in self.condensation['components']:
+			if len(members) == 1:
+				components.append(nodes[members[0]])
+			else:
+				size = round(0.75 * math.sqrt(len(members)), 2)
+				components.append((f"{nodes[members[0]]} +{len(members) - 1}", {'width': size, 'height': size}))
+		names = [component[0] if isinstance(component, tuple) else component for component in components]
+		
+		edges = []
+		for (m, n), weight in self.condensation['weights'].items():
+			attrs = {'penwidth': round(1 + math.log2(weight), 2), 'weight': weight}
+			if weight > 1:
+				attrs['label'] = weight
+			edges.append((names[m], names[n], attrs))
+		
+		Graph.load_viz(self.viz, components, edges)
+		self.reset_viz_matrix()
 
 	def set_from_boolean(self, boolean: iter, **d) -> None:
 		""" Set viz graph from boolean matrix and nodes if given.
@@ -545,13 +789,12 @@ class Graph(object):
 			raise ValueError("Wrong empty matrix")
 		
 		dim = len(matrix)
-		self.set_nodes(dim=dim, cut=True, **d)
-		nodes = self.viz.nodes()
+		nodes = self.get_nodes(dim=dim, cut=True, **d)
 
-		matrixS = [[str(matrix[m][n]) for n in range(dim)] for m in range(dim)]
-		edges = [(nodes[m], nodes[n]) for m in range(dim) for n in range(dim) if matrixS[m][n] != '0']
+		edges = [(nodes[m], nodes[n]) for m in range(dim) for n, value in enumerate(matrix[m]) if str(value) != '0']
 		
-		self.set_edges(edges=edges)
+		Graph.load_viz(self.viz, nodes, edges)
+		self.viz_nodes, self.viz_matrixM, self.viz_labels = nodes, Graph.get_boolean_rows(matrix), None
 
 	def set_from_matrix(self, matrix: iter, **d) -> None:
 		""" Set viz graph from a common matrix and nodes if given.
@@ -585,12 +828,13 @@ class Graph(object):
 			raise ValueError("Wrong empty matrix")
 		
 		dim = len(matrix)
-		self.set_nodes(dim=dim, cut=True, **d)
-		nodes = self.viz.nodes()
+		nodes = self.get_nodes(dim=dim, cut=True, **d)
 
 		edges = [(nodes[m], nodes[n], matrix[m][n]) for m in range(dim) for n in range(dim) if matrix[m][n] != None]
 		
-		self.set_edges(edges=edges)
+		Graph.load_viz(self.viz, nodes, edges)
+		self.viz_nodes = nodes
+		self.viz_matrixM, self.viz_labels = Graph.get_matrix_rows(matrix)
 
 	def set_from_nodes_edges(self, **d) -> None:
 		""" Set the graph from both nodes and edges passed as arguments 
@@ -671,7 +915,10 @@ class Graph(object):
 		if 'graph_attr' in d:
 			self.graph_attr.update(d['graph_attr'])
 		
+		# Graphviz is loaded only by graphs drawn
+		import pygraphviz
 		self.viz = pygraphviz.AGraph(**self.graph_attr)
+		self.reset_viz_matrix()
 		
 		# TODO: remove
 		self.init_attrs()
@@ -693,10 +940,10 @@ class Graph(object):
 		>>> g.viz.nodes()
 		['UU', 'V', 'X', 'Y', 'Z', 'T']
 		"""
-		# add to viz
-		edges = self.convert_edges(edges)
-		for u, v, l in edges:
-			self.viz.add_edge(u, v, label=l)
+		# add to viz in the given order, consecutive edges sharing a label are added together
+		for label, edges_label in itertools.groupby(self.convert_edges(edges), key=lambda edge: edge[2]):
+			self.viz.add_edges_from([(u, v) for u, v, _ in edges_label], label=label)
+		self.reset_viz_matrix()
 
 	def str_nodes(self):
 		""" Return a representation of nodes to string
@@ -723,6 +970,46 @@ class Graph(object):
 		"""
 		return ' '.join(i+'-'+j for i,j in self.viz.edges()) if self.viz.edges else ''
 
+	def write_dot(self, file, binary: iter, **d) -> None:
+		""" Stream the graph of a binary matrix in DOT format without viz
+		
+		Edges are generated from rows by iterating bits, the memory is constant whatever the number of edges.
+		Attributes of the graph are the class attributes, see :class:`graphm.dotwriter.DotWriter`
+		
+		:param file: file object opened in text mode or :class:`graphm.dotwriter.DotWriter`
+		:param iter binary: binary square matrix containing matrixM in format [int, ...] or class MatrixBinary
+		:param dict \*\*d: containing optionally nodes, node_style
+		
+			:nodes: (iter(str)) names of nodes
+			:node_style: (str) node name generation style: 'str' or 'int' 
+						
+				default: :class:`Graph.node_style`
+
+		>>> import io
+		>>> f = io.StringIO()
+		>>> Graph().write_dot(f, [1, 4, 2], node_style='int')
+		>>> print(f.getvalue()) # doctest: +ELLIPSIS
+		digraph "" {
+		graph ["label"="G", "rankdir"="TB", "ranksep"="0.5"];
+		...
+		"0" -> "2";
+		"1" -> "0";
+		"2" -> "1";
+		}
+		<BLANKLINE>
+		"""
+		if isinstance(binary, MatrixBinary):
+			matrix, dim = binary.matrixM, binary.dimN
+		else:
+			matrix, dim = binary, len(binary)
+		nodes = self.get_nodes(dim=dim, cut=True, **d)
+		
+		if isinstance(file, DotWriter):
+			file.add_binary(matrix, dim, nodes)
+		else:
+			with DotWriter(file, graph_attr=self.graph_attr, node_attr=self.node_attr, edge_attr=self.edge_attr) as writer:
+				writer.add_binary(matrix, dim, nodes)
+
 	def update_attrs(self, **d) -> None:
 		""" Add viz attributes to drawing
 		
@@ -746,4 +1033,133 @@ class Graph(object):
 				attr_viz = getattr(self.viz, attr_name)
 				attr_viz.update(d[attr_name])
 
+	def update_from_binary(self, binary: iter, **d) -> dict:
+		""" Update viz from a binary matrix, only edges added or removed are changed in viz
+		
+		:param iter binary: binary square matrix containing matrixM in format [int, ...] or class MatrixBinary
+		:param dict \*\*d: containing optionally nodes, node_style, see :meth:`Graph.set_from_binary`
+		
+		:return: the changes, see :meth:`Graph.update_viz`
+		:rtype: dict
+		
+		>>> g = Graph(binary=[2**n for n in range(8)])
+		>>> g.update_from_binary([2**n for n in range(7)] + [129])
+		{'added': 1, 'removed': 0, 'changed': 0, 'loaded': False}
+		>>> g.viz.has_edge('H', 'H')
+		True
+		>>> g.update_from_binary([0] * 8)
+		{'added': 0, 'removed': 9, 'changed': 0, 'loaded': True}
+		
+		The viz set without a matrix is loaded at once
+		
+		>>> upper = [2**n - 1 for n in range(19, -1, -1)]
+		>>> g = Graph(binary=upper)
+		>>> g.set_from_condensed(upper)
+		>>> g.update_from_binary(upper[:-1] + [2**19])
+		{'added': 191, 'removed': 19, 'changed': 0, 'loaded': True}
+		>>> g.viz.number_of_edges()
+		191
+		"""
+		matrix = binary.matrixM if isinstance(binary, MatrixBinary) else binary
+		if not matrix:
+			raise ValueError("Wrong empty matrix")
+		
+		return self.update_viz(self.get_nodes(dim=len(matrix), cut=True, **d), list(matrix))
 
+	def update_from_boolean(self, boolean: iter, **d) -> dict:
+		""" Update viz from a boolean matrix, only edges added or removed are changed in viz
+		
+		:param iter boolean: boolean square matrix in formats [str, ...] or [[int,...], ...] or (str, ...) or ((int,...), ...)
+		:param dict \*\*d: containing optionally nodes, node_style, see :meth:`Graph.set_from_boolean`
+		
+		:return: the changes, see :meth:`Graph.update_viz`
+		:rtype: dict
+		
+		>>> g = Graph(boolean=['00010', '01100', '10000', '10100', '00000'])
+		>>> g.update_from_boolean(['00010', '01100', '10000', '10100', '00001'])
+		{'added': 1, 'removed': 0, 'changed': 0, 'loaded': False}
+		"""
+		matrix = boolean.matrix if isinstance(boolean, MatrixBoolean) else boolean
+		if not matrix:
+			raise ValueError("Wrong empty matrix")
+		
+		return self.update_viz(self.get_nodes(dim=len(matrix), cut=True, **d), Graph.get_boolean_rows(matrix))
+
+	def update_from_matrix(self, matrix: iter, **d) -> dict:
+		""" Update viz from a common matrix, only edges added, removed or with a new label are changed in viz
+		
+		:param iter matrix: square matrix in formats [[int,...], ...] or ((int,...), ...)
+		:param dict \*\*d: containing optionally nodes, node_style, see :meth:`Graph.set_from_matrix`
+		
+		:return: the changes, see :meth:`Graph.update_viz`
+		:rtype: dict
+		
+		>>> g = Graph(matrix=((None, 2, 1), (5, None, 1), (1, 1, 1)))
+		>>> g.update_from_matrix(((None, 3, 1), (5, None, 1), (1, 1, 1)))
+		{'added': 0, 'removed': 0, 'changed': 1, 'loaded': False}
+		>>> g.viz.get_edge('A', 'B').attr['label']
+		'3'
+		"""
+		if not matrix:
+			raise ValueError("Wrong empty matrix")
+		
+		matrixM, labels = Graph.get_matrix_rows(matrix)
+		return self.update_viz(self.get_nodes(dim=len(matrix), cut=True, **d), matrixM, labels)
+
+	def update_viz(self, nodes: list, matrixM: list, labels: dict=None) -> dict:
+		""" Apply to viz the differences between the matrix loaded in viz and the given one
+		
+		Rows are compared by a XOR, then only the edges added or removed are changed in viz.
+		If the viz was not loaded from a matrix, see :meth:`Graph.reset_viz_matrix`, if nodes differ from
+		the loaded ones, or if the changes are too many, see :attr:`Graph.update_ratio`,
+		the viz is loaded at once, see :meth:`Graph.load_viz`
+		
+		:param list nodes: names of nodes
+		:param list matrixM: binary rows of edges, see :class:`MatrixBinary`
+		:param dict labels: labels of edges indexed by (m, n)
+		
+			default = None / edges without labels
+		
+		:return: the changes with keys:
+		
+			:added: (int) number of edges added
+			:removed: (int) number of edges removed
+			:changed: (int) number of labels changed
+			:loaded: (bool) True if the viz is loaded at once
+		
+		:rtype: dict
+		"""
+		dim = len(nodes)
+		loaded = nodes != self.viz_nodes or (labels is None) != (self.viz_labels is None)
+		
+		added, removed = [], []
+		if not loaded:
+			diffs = [line_old ^ line for line_old, line in zip(self.viz_matrixM, matrixM)]
+			for m, n in MatrixBinary.iter_edges(diffs, dim):
+				(added if matrixM[m] >> (dim - n - 1) & 1 else removed).append((m, n))
+		changed = [edge for edge, label in labels.items() if edge in self.viz_labels and self.viz_labels[edge] != label] if labels and not loaded else []
+		
+		changes = len(added) + len(removed) + len(changed)
+		edges_count = sum(bin(line).count('1') for line in matrixM)
+		if not loaded and changes > Graph.update_ratio * max(edges_count, 1):
+			loaded = True
+		
+		if loaded:
+			# all edges of viz are replaced, even those not loaded from a matrix
+			result = {'added': edges_count, 'removed': self.viz.number_of_edges(), 'changed': 0, 'loaded': True}
+			edges = [(nodes[m], nodes[n], labels[(m, n)]) if labels else (nodes[m], nodes[n]) for m, n in MatrixBinary.iter_edges(matrixM, dim)]
+			Graph.load_viz(self.viz, nodes, edges)
+		else:
+			for m, n in removed:
+				self.viz.remove_edge(nodes[m], nodes[n])
+			for m, n in added:
+				if labels and labels[(m, n)] not in (None, ''):
+					self.viz.add_edge(nodes[m], nodes[n], label=labels[(m, n)])
+				else:
+					self.viz.add_edge(nodes[m], nodes[n])
+			for m, n in changed:
+				self.viz.get_edge(nodes[m], nodes[n]).attr['label'] = labels[(m, n)]
+			result = {'added': len(added), 'removed': len(removed), 'changed': len(changed), 'loaded': False}
+		
+		self.viz_nodes, self.viz_matrixM, self.viz_labels = nodes, list(matrixM), labels
+		return result
@@ -3,8 +3,11 @@ Created on Apr 26, 2021
 
 @author: salem Aguemoun
 '''
-import pygraphviz
+import io
+import graphm.dotwriter
+import graphm.graph
 import graphm.matrixbinary
+DotWriter = graphm.dotwriter.DotWriter
 MatrixBinary = graphm.matrixbinary.MatrixBinary
 
 class GraphM(object):
@@ -25,6 +28,14 @@ class GraphM(object):
 			
 			**dot** / neato, dot, twopi, circo, fdp, nop
 
+	:var RenderCache render_cache: cache of drawings used by :meth:`GraphM.draw`, see :class:`graphm.rendercache.RenderCache`
+	
+		**None** / drawings are not cached
+	
+	:var str color_reached: color of edges newly reached in frames of the closure, see :meth:`GraphM.get_frames`
+	
+		**red**
+	
 	:var dict graph_attr: default attributes for graph, see :class:`pygraphviz.Agraph`
 	
 		:directed: (bool) directed graph or not
@@ -60,6 +71,8 @@ class GraphM(object):
 	
 	"""
 	node_style = 'str'
+	render_cache = None
+	color_reached = 'red'
 	layout = {
 		'prog' : 'dot',
 		}
@@ -242,6 +255,10 @@ class GraphM(object):
 		
 		:param dict \*\*d: options to specify the type of matrix
 		
+			:cache: (RenderCache) cache of drawings, None to draw without cache
+			
+				default: :attr:`GraphM.render_cache`
+			
 			for **viz**
 			
 			:label='G': (str) label for the graph
@@ -296,11 +313,53 @@ class GraphM(object):
 		# viz
 		self.update_attrs(**d)
 		
-		# draw
+		# draw, or get the drawing from cache
 		# TODO
 		#self.viz.layout(prog=self.layout['prog'])
-		self.viz.layout(**self.layout)
-		self.viz.draw(path, ext)
+		cache = d['cache'] if 'cache' in d else self.render_cache
+		if cache is not None:
+			cache.draw(self.viz, path, ext, self.layout)
+		else:
+			self.viz.layout(**self.layout)
+			self.viz.draw(path, ext)
+
+	def draw_dot(self, binary: iter, path: str="files/tmp.png", ext: str='png', **d) -> None:
+		""" Draw the graph of a binary matrix to a file without viz,
+		the graph is streamed to the layout program running in another process
+		
+		:param iter binary: binary square matrix containing matrixM in format [int, ...] or class MatrixBinary
+		:param str path=files/tmp.png: path to write the file
+		:param str ext='png': format of the file
+		:param dict \*\*d: options for nodes, see :meth:`GraphM.write_dot`
+		"""
+		with DotWriter.open_layout(path, ext, self.layout['prog'], graph_attr=GraphM.graph_attr, node_attr=GraphM.node_attr, edge_attr=GraphM.edge_attr) as writer:
+			self.write_dot(writer, binary, **d)
+
+	def draw_slides(self, slides: 'graphm.matrixbinaryslides.MatrixBinarySlides', path: str="files/slide{deep}.png", ext: str='png', closure: bool=False) -> list:
+		""" Draw one file by slide of the closure, with the nodes at the same positions in all files
+		
+		The graph is laid out once, then each frame is drawn by the engine 'nop', like 'neato -n',
+		which keeps the positions of nodes and only routes edges, see :meth:`GraphM.get_frames`
+		
+		:param MatrixBinarySlides slides: slides of the closure of the matrix of the graph
+		:param str path=files/slide{deep}.png: path of files, formatted with the deep of each slide
+			from 1, like the labels of frames
+		:param str ext='png': format of files
+		:param bool closure: draw the closure reached at each deep instead of each slide
+		
+			default = False
+		
+		:return: paths of files drawn
+		:rtype: list
+		"""
+		import pygraphviz
+		
+		paths = []
+		for deep, frame in enumerate(self.get_frames(slides, closure), 1):
+			paths.append(path.format(deep=deep))
+			# arguments of programs are not given to the layouts made in process, 'nop' is 'neato -n'
+			pygraphviz.AGraph(string=frame).draw(paths[-1], format=ext, prog='nop')
+		return paths
 
 	def generate_nodes(self, **d) -> list:
 		""" Return nodes names generating with the type given
@@ -323,6 +382,7 @@ class GraphM(object):
 		['0', '1', '2', '3', '4']
 		"""
 		# default
+		dim = d['dim'] if 'dim' in d else self.dim
 		node_style = d['node_style'] if 'node_style' in d else GraphM.node_style
 			
 		# characters
@@ -331,19 +391,85 @@ class GraphM(object):
 			letters = [chr(begin + i) for i in range(26)]
 			nodes = letters[:]
 			c = 0
-			while len(nodes) < self.dim:
+			while len(nodes) < dim:
 				nodes.extend(letters[c]+s for s in letters)
 				c += 1
-			nodes = nodes[:self.dim]
+			nodes = nodes[:dim]
 
 		# numeric
 		elif node_style == "int":
-			nodes = [str(i) for i in range(self.dim)]
+			nodes = [str(i) for i in range(dim)]
 		else:
 			raise ValueError("Wrong option for node_style: {node_style}")
 
 		return nodes
 		
+	def get_frames(self, slides: 'graphm.matrixbinaryslides.MatrixBinarySlides', closure: bool=False) -> list:
+		""" Return a graph in DOT format for each slide of the closure, nodes are pinned
+		to the positions of one layout of the graph
+		
+		Positions are given in points, frames have to be drawn with 'neato -n' or the engine 'nop'.
+		The label of each frame is followed by the rank of its slide
+		
+		:param MatrixBinarySlides slides: slides of the closure of the matrix of the graph
+		:param bool closure: each frame has the edges reached until its deep
+			and the new ones are drawn in :attr:`GraphM.color_reached`, otherwise the edges of the slide
+		
+			default = False
+		
+		:return: graphs in DOT format, one by deep
+		:rtype: list
+		
+		>>> g = GraphM(boolean=['010', '001', '000'])
+		>>> import graphm.matrixbinaryslides
+		>>> slides = graphm.matrixbinaryslides.MatrixBinarySlides(MatrixBinary(boolean=['010', '001', '000']).closure_slides())
+		>>> frames = g.get_frames(slides, closure=True)
+		>>> len(frames)
+		2
+		>>> print(frames[1]) # doctest: +ELLIPSIS
+		strict graph "" {
+		graph ["label"="G 2", ...];
+		...
+		"A" ["pos"=..., "width"=..., "height"=...];
+		...
+		"A" -- "B";
+		"A" -- "C" ["color"="red"];
+		"B" -- "C";
+		}
+		<BLANKLINE>
+		"""
+		nodes = self.viz.nodes()
+		if len(nodes) != slides.dim:
+			raise ValueError(f"The number of nodes: {len(nodes)} is different of the dimension of slides: {slides.dim}")
+		
+		# one layout of the graph gives the positions of all frames
+		viz = self.viz.copy()
+		viz.layout(**self.layout)
+		pinned = [(node, {attr: viz.get_node(node).attr[attr] for attr in ('pos', 'width', 'height')}) for node in nodes]
+		
+		graph_attr = {key: value for key, value in self.viz.graph_attr.items() if value != ''}
+		graph_attr['directed'] = self.viz.directed
+		graph_attr['strict'] = self.viz.strict
+		label = graph_attr.get('label', '')
+		
+		frames = []
+		reached = [0] * slides.dim
+		for deep, slide in enumerate(slides.slidesM[:slides.deep]):
+			graph_attr['label'] = f"{label} {deep + 1}".strip()
+			rows = [line | reached[m] for m, line in enumerate(slide)] if closure else slide
+			f = io.StringIO()
+			with DotWriter(f, graph_attr=graph_attr, node_attr=dict(self.viz.node_attr), edge_attr=dict(self.viz.edge_attr)) as writer:
+				for node, attrs in pinned:
+					writer.add_node(node, **attrs)
+				for m, n in MatrixBinary.iter_edges(rows, slides.dim):
+					if closure and not reached[m] >> (slides.dim - n - 1) & 1:
+						writer.add_edge(nodes[m], nodes[n], color=self.color_reached)
+					else:
+						writer.add_edge(nodes[m], nodes[n])
+			reached = [line_reached | line for line_reached, line in zip(reached, slide)]
+			frames.append(f.getvalue())
+		return frames
+
 	def init_viz_attrs(self) -> None:
 		""" Set default viz attributes to drawing with default class attributes for viz
 		
@@ -415,10 +541,13 @@ class GraphM(object):
 			raise ValueError("Wrong empty matrix")
 
 		self.dim = len(matrix)
-		self.matrix = [[int(n) for n in self.int2str(m)] for m in matrix]
+		edges = list(MatrixBinary.iter_edges(matrix, self.dim))
+		self.matrix = [[0] * self.dim for _ in range(self.dim)]
+		for m, n in edges:
+			self.matrix[m][n] = 1
 		
 		self.set_nodes(**d)
-		self.set_edges(self.viz.nodes())
+		self.set_edges(self.viz.nodes(), edges)
 
 	def set_from_boolean(self, boolean: iter, **d) -> None:
 		""" Set boolean matrix with int 0/1 from boolean matrix and nodes if given
@@ -535,15 +664,20 @@ class GraphM(object):
 		# 	graph_attr.update(d['graph_attr'])
 		# 	d.pop('graph_attr')
 		
+		# Graphviz is loaded only by graphs drawn
+		import pygraphviz
 		self.viz = pygraphviz.AGraph()
 		
 		self.init_viz_attrs()
 		self.update_attrs(**d)
 
-	def set_edges(self, nodes: list=[]) -> None:
+	def set_edges(self, nodes: list=[], edges: iter=None) -> None:
 		""" Add edges to viz from arguments edges & nodes
 		
 		:param list nodes: nodes of graph
+		:param iter edges: edges in tuple (m, n) of indexes of nodes
+		
+			default = None / edges of the matrix
 
 		>>> g = GraphM(boolean=['00010', '01100', '10000', '10100', '00000'])
 		>>> g.viz.edges()
@@ -553,15 +687,12 @@ class GraphM(object):
 		>>> g.viz.edges()
 		[('a', 'd'), ('d', 'c'), ('b', 'b'), ('b', 'c'), ('c', 'a')]
 		"""
-		# remove existing nodes
-		self.viz.remove_edges_from(self.viz.edges())
-		
 		nodes = self.convert_nodes(nodes)
+		if edges is None:
+			edges = ((m, n) for m, line in enumerate(self.matrix) for n, value in enumerate(line) if value)
 		
-		for m in range(self.dim):
-			for n in  range(self.dim):
-				if self.matrix[m][n]:
-					self.viz.add_edge(nodes[m], nodes[n])
+		# existing edges are replaced at once
+		graphm.graph.Graph.load_viz(self.viz, graphm.graph.Graph.get_viz_nodes(self.viz), [(nodes[m], nodes[n]) for m, n in edges])
 
 	def set_nodes(self, cut :bool=True, **d) -> None:
 		""" Add nodes to viz from:
@@ -587,9 +718,6 @@ class GraphM(object):
 		>>> g.viz.nodes()
 		['UU', 'V', 'X', 'Y', 'Z']
 		"""
-		# remove existing nodes
-		self.viz.remove_nodes_from(self.viz.nodes())
-		
 		if 'nodes' in d:
 			if not hasattr(self, 'dim'):
 				raise ValueError("The graph has no dimension")
@@ -605,9 +733,8 @@ class GraphM(object):
 		else:
 			nodes = self.generate_nodes(**d)
 
-		# add to viz
-		for node in nodes:
-			self.viz.add_node(node)
+		# existing nodes and edges are replaced at once
+		graphm.graph.Graph.load_viz(self.viz, nodes, [])
 
 	def str(self) -> str:
 		""" Return the dimension, matrix and the length of nodes if exists
@@ -663,6 +790,48 @@ class GraphM(object):
 		"""
 		return ' '.join(self.viz.nodes()) if self.viz else ""
 
+	def write_dot(self, file, binary: iter, **d) -> None:
+		""" Stream the graph of a binary matrix in DOT format without viz
+		
+		Edges are generated from rows by iterating bits, the memory is constant whatever the number of edges.
+		Attributes of the graph are the class attributes, see :class:`graphm.dotwriter.DotWriter`
+		
+		:param file: file object opened in text mode or :class:`graphm.dotwriter.DotWriter`
+		:param iter binary: binary square matrix containing matrixM in format [int, ...] or class MatrixBinary
+		:param dict \*\*d: containing optionally nodes, node_style
+		
+			:nodes: (iter(str)) names of nodes
+			:node_style: (str) node name generation style: 'str' or 'int' 
+
+		>>> import io
+		>>> f = io.StringIO()
+		>>> GraphM().write_dot(f, [1, 4, 2], nodes='xa,xb,xc,xd')
+		>>> print(f.getvalue()) # doctest: +ELLIPSIS
+		digraph "" {
+		...
+		"xa";
+		"xb";
+		"xc";
+		"xa" -> "xc";
+		"xb" -> "xa";
+		"xc" -> "xb";
+		}
+		<BLANKLINE>
+		"""
+		if isinstance(binary, MatrixBinary):
+			matrix, dim = binary.matrixM, binary.dimN
+		else:
+			matrix, dim = binary, len(binary)
+		nodes = self.convert_nodes(d['nodes'])[:dim] if 'nodes' in d else self.generate_nodes(dim=dim, **d)
+		if len(nodes) < dim:
+			raise ValueError(f"The number of names: {len(nodes)} is less than the number of nodes: {dim}")
+		
+		if isinstance(file, DotWriter):
+			file.add_binary(matrix, dim, nodes)
+		else:
+			with DotWriter(file, graph_attr=GraphM.graph_attr, node_attr=GraphM.node_attr, edge_attr=GraphM.edge_attr) as writer:
+				writer.add_binary(matrix, dim, nodes)
+
 	def update_attrs(self, **d) -> None:
 		""" Add viz attributes to drawing
 		
@@ -3,7 +3,10 @@ Created on Apr 26, 2021
 
 @author: salem Aguemoun
 '''
+from collections import Counter
+import heapq
 import graphm.graph
+import graphm.topologicalorder
 
 class GraphPert(graphm.graph.Graph):
 	""" Manage Pert graph.
@@ -60,10 +63,30 @@ class GraphPert(graphm.graph.Graph):
 		
 	.. CAUTION:: Instance variables
 	
-	:var list matrix: matrix of graph.
+	:var dict successors: for each node index, the tasks to its successors indexed by successor
+	:var dict ancestors: for each node index, the tasks from its ancestors indexed by ancestor
 	
+		Tasks are the task names, or a list containing the task name for fictional ones.
 		Generated from initialization to simplify the build of Pert's graph
 	
+	:var list order: indexes of nodes in topological order, see :meth:`GraphPert.get_order`
+	
+	:var dict nodes_values: for each node index, a list with: index, earliest time, latest time
+	
+	:var dict order_i: position of nodes in topological order indexed by node
+	
+	:var dict tasks_times: times of tasks indexed by task, see :meth:`GraphPert.set_cpm`
+	
+	:var dict tasks_edges: edges of tasks in topological order indexed by task
+	
+	:var dict successors_critical: successors by critical edges indexed by node, see :meth:`GraphPert.set_critical`
+	
+	:var set edges_critical: edges with a null float
+	
+	:var set nodes_critical: nodes with the same earliest and latest times
+	
+	:var tuple path_unique: the critical path with the fewest edges
+	
 	:var pygraphviz.AGraph viz: manage drawing in dot format with :class:`pygraphviz.AGraph`
 
 	:var dict layout: graph layout, see :class:`GraphPert.layout`
@@ -116,14 +139,31 @@ class GraphPert(graphm.graph.Graph):
 		else:
 			d[index] = {item}
 		
+	def __repr__(self) -> str:
+		""" Return the number of nodes and of edges, see :meth:`graphm.graph.Graph.__repr__`
+		
+		Without viz, numbers are given by the successors
+		"""
+		if self.viz is None:
+			edges = sum(len(tasks) for tasks in self.successors.values())
+			return f"nodes={self.dim} edges={edges}"
+		return super().__repr__()
+	
+	def __str__(self) -> str:
+		""" Return the representation of nodes, edges and list of nodes and edges, see :meth:`graphm.graph.Graph.__str__`
+		
+		Without viz, only the numbers of nodes and edges are given
+		"""
+		if self.viz is None:
+			return repr(self)
+		return super().__str__()
+	
 	def add_critical(self) -> None:
 		""" Add critical path to viz from:
 		"""
 		sbu = self.viz.add_subgraph(name='critical', label='', color='white')
 		#sbc = self.viz.add_subgraph(name='critical')
 		
-		self.set_critical()
-		self.set_nodes_index()
 		self.add_nodes_critical(sbu, sbu)
 		self.add_edges_critical(sbu, sbu)
 		
@@ -131,14 +171,14 @@ class GraphPert(graphm.graph.Graph):
 		""" add edge in pygraphviz.AGraph passed in argument
 		"""
 		m, n = edge
-		task = self.matrix[m][n]
+		task = self.successors[m][n]
 		if isinstance(task, str):
 			d.update({
 				'label': f"{task}.{self.tasks_value[task]}",
 			})
 		# fictional edges
 		else:
-			task = task.pop()
+			task = task[0]
 			d.update({
 				'label': f"{task}.0",
 				 'style': 'dashed',
@@ -149,9 +189,7 @@ class GraphPert(graphm.graph.Graph):
 		""" Add edges to viz from:
 		"""
 		# all edges reduce by critical ones
-		#TODO: delete
-		#edges = {(m, n): self.matrix[m][n] for n in range(self.dim) for m in range(self.dim) if self.matrix[m][n] and (m, n) not in self.edges_critical}
-		edges = {(m, n): self.matrix[m][n] for n in range(self.dim) for m in range(self.dim) if self.matrix[m][n] and (m, n) not in self.edges_critical}
+		edges = {(m, n): self.ancestors[n][m] for n in range(self.dim) for m in sorted(self.ancestors[n]) if self.ancestors[n][m] and (m, n) not in self.edges_critical}
 		for edge, task in edges.items():
 			d = {} if isinstance(task, str) else {'color': 'dodgerblue4', 'fontcolor': 'dodgerblue4'}
 			self.add_edge_viz(self.viz, edge, **d)
@@ -171,40 +209,6 @@ class GraphPert(graphm.graph.Graph):
 			
 			self.add_edge_viz(sb, edge, **args)
 
-	def add_node_value_down(self, node_from: str, node: int) -> None:
-		"""
-		.. IMPORTANT:: node here is node index
-		
-		"""
-		# edge is not fictional
-		if isinstance(self.matrix[node_from][node], str):
-			value_edge = self.tasks_value[self.matrix[node_from][node]]
-		else:
-			value_edge = 0
-		value_from = self.nodes_values[node_from][1]
-		
-		if value_from + value_edge > self.nodes_values[node][1]:
-			self.nodes_values[node][1] = value_from + value_edge
-	
-	def add_node_value_back(self, node_scs: str, node: int) -> None:
-		"""
-		.. IMPORTANT:: node here is node index
-		
-		"""
-		if isinstance(self.matrix[node][node_scs], str):
-			value_edge = self.tasks_value[self.matrix[node][node_scs]]
-		else:
-			value_edge = 0
-		value_from = self.nodes_values[node_scs][2]
-		
-		# node_from is without end, keep path of unique node come from without end 		
-		if value_from > -1:
-			if self.nodes_values[node][2] < 0:
-				self.nodes_values[node][2] = value_from - value_edge
-			else:
-				if value_from - value_edge < self.nodes_values[node][2]:
-					self.nodes_values[node][2] = value_from - value_edge
-
 	def add_node_viz(self, sb: 'pygraphviz.AGraph', node, **d) -> None:
 		""" add node in pygraphviz.AGraph passed in argument
 		"""
@@ -256,27 +260,50 @@ class GraphPert(graphm.graph.Graph):
 			sb.add_edge(f"r{rank - 1}", f"r{rank}", label=rank)
 		sb.layout(prog='dot')
 			
+	def add_task(self, m: int, n: int, task: any) -> None:
+		""" Add or replace the task of the edge between nodes m and n
+		
+		.. IMPORTANT:: node here is node index
+		
+		:param int m: node index of ancestor
+		:param int n: node index of successor
+		:param any task: name of task or a list containing the name of task for a fictional one
+		"""
+		self.successors[m][n] = task
+		self.ancestors[n][m] = task
+	
+	def remove_task(self, m: int, n: int) -> None:
+		""" Remove the task of the edge between nodes m and n if exists
+		
+		.. IMPORTANT:: node here is node index
+		"""
+		if n in self.successors[m]:
+			del self.successors[m][n]
+			del self.ancestors[n][m]
+	
 	def matrix_add_fictionals(self, node_ref: str, nodes_fictional: set, node_old: str) -> None:
-		for node in nodes_fictional:
-			self.matrix[self.nodes_i[node]][self.nodes_i[node_ref]] = [node]
+		for node in sorted(nodes_fictional, key=self.nodes_i.get):
+			self.add_task(self.nodes_i[node], self.nodes_i[node_ref], [node])
 			# remove old one
-			self.matrix[self.nodes_i[node]][self.nodes_i[node_old]] = None
+			self.remove_task(self.nodes_i[node], self.nodes_i[node_old])
 
 	def matrix_merge_nodes(self, node_ref: str, nodes_merged: list, node_end: str) -> None:
-		for node in nodes_merged:
+		ref = self.nodes_i[node_ref]
+		for node in sorted(nodes_merged, key=self.nodes_i.get):
+			i = self.nodes_i[node]
 			# remove edge to 
-			self.matrix[self.nodes_i[node]][self.nodes_i[node_end]] = None
+			self.remove_task(i, self.nodes_i[node_end])
 
-			# rows
-			for n in range(self.dim):
-				if self.matrix[self.nodes_i[node]][n] != None:
-					self.matrix[self.nodes_i[node_ref]][n] = self.matrix[self.nodes_i[node]][n]
-					self.matrix[self.nodes_i[node]][n] = None
-			# columns
-			for m in range(self.dim):
-				if self.matrix[m][self.nodes_i[node]] != None:
-					self.matrix[m][self.nodes_i[node_ref]] = self.matrix[m][self.nodes_i[node]]
-					self.matrix[m][self.nodes_i[node]] = None
+			# successors
+			for n in sorted(self.successors[i]):
+				task = self.successors[i][n]
+				self.remove_task(i, n)
+				self.add_task(ref, n, task)
+			# ancestors
+			for m in sorted(self.ancestors[i]):
+				task = self.ancestors[i][m]
+				self.remove_task(m, i)
+				self.add_task(m, ref, task)
 			
 	def matrix_reduce_nodes(self, nodes_merged: set, new_end: str) -> None:
 		""" 
@@ -286,60 +313,180 @@ class GraphPert(graphm.graph.Graph):
 		if new_end:
 			nodes_merged.add(self.node_end)
 			self.node_end = new_end
-			# remove old ending successor for the new ending node
-			self.matrix[self.nodes_i[new_end]][self.dim - 1] = ''
 		nodes_merged_i = {self.nodes_i[node] for node in nodes_merged}
 		
-		self.matrix = [
-				[self.matrix[m][n] for n in range(self.dim) if n not in nodes_merged_i]
-				for m in range(self.dim) if m not in nodes_merged_i
-				]
+		# new indexes without merged nodes
+		indexes = {}
+		for i in range(self.dim):
+			if i not in nodes_merged_i:
+				indexes[i] = len(indexes)
+		self.successors = {indexes[m]: {indexes[n]: task for n, task in tasks.items() if n in indexes} for m, tasks in self.successors.items() if m in indexes}
+		self.ancestors = {indexes[n]: {indexes[m]: task for m, task in tasks.items() if m in indexes} for n, tasks in self.ancestors.items() if n in indexes}
 		
-		self.dim = len(self.matrix)
+		self.dim = len(indexes)
 		self.nodes = [node for node in self.nodes if node not in nodes_merged]
 		self.nodes_i = {node: i for i, node in enumerate(self.nodes)}
 
 	def get_ancestors(self, fictional: bool=False) -> dict:
-		""" get ancestors from self matrix
+		""" get ancestors from self ancestors
 		
 		dict of set
 		"""
 		if fictional:
-			ancestors = {n: {m for m in range(self.dim) if self.matrix[m][n] != None} for n in range(self.dim)}
+			ancestors = {n: set(tasks) for n, tasks in self.ancestors.items()}
 		else:
-			ancestors = {n: {m for m in range(self.dim) if self.matrix[m][n] != None and isinstance(self.matrix[m][n], str)} for n in range(self.dim)}
+			ancestors = {n: {m for m, task in tasks.items() if isinstance(task, str)} for n, tasks in self.ancestors.items()}
 		return ancestors
 	
 	def get_ancestors_label(self, fictional: bool=False) -> dict:
-		""" get ancestors from self matrix
+		""" get ancestors from self ancestors
 		
 		dict of set
 		"""
 		if fictional:
-			ancestors = {self.nodes[n]: {self.nodes[m] for m in range(self.dim) if self.matrix[m][n] != None} for n in range(self.dim)}
+			ancestors = {self.nodes[n]: {self.nodes[m] for m in tasks} for n, tasks in self.ancestors.items()}
 		else:
-			ancestors = {self.nodes[n]: {self.nodes[m] for m in range(self.dim) if self.matrix[m][n] != None and isinstance(self.matrix[m][n], str)} for n in range(self.dim)}
+			ancestors = {self.nodes[n]: {self.nodes[m] for m, task in tasks.items() if isinstance(task, str)} for n, tasks in self.ancestors.items()}
 		return ancestors
 	
+	def get_layers(self, sweeps: int=4) -> list:
+		""" Return nodes by rank, ordered inside each rank to reduce the crossings of edges
+		
+		Nodes are ordered by the barycenter of their neighbors: from the first rank to the last one
+		with their ancestors, then back with their successors, and so on for each sweep.
+		Nodes only reached by fictional tasks are ranked after their ancestors
+		
+		.. IMPORTANT:: nodes here are node indexes
+		
+		:param int sweeps: number of sweeps down and up
+		
+			default = 4
+		
+		:return: ordered nodes for each rank
+		:rtype: list
+		
+		>>> g = GraphPert(pert={'A': ('', 2), 'B': ('', 3), 'C': ('A', 1), 'D': ('B', 1), '<': ('C,D', 0)}, viz=False)
+		>>> [len(layer) for layer in g.get_layers()]
+		[1, 2, 1]
+		"""
+		ranks_node = {node: rank for rank, nodes in self.ranks.items() for node in nodes}
+		for node in self.order:
+			if node not in ranks_node:
+				ranks_node[node] = max((ranks_node[ancestor] + 1 for ancestor in self.ancestors.get(node, ()) if ancestor in ranks_node), default=0)
+		
+		layers = [[] for _ in range(max(ranks_node.values()) + 1)]
+		for node in sorted(ranks_node):
+			layers[ranks_node[node]].append(node)
+		
+		# relative position of nodes in their rank
+		position = {}
+		def place(layer: list) -> None:
+			for i, node in enumerate(layer):
+				position[node] = (i + 0.5) / len(layer)
+		
+		def barycenter(node: int, neighbors: iter) -> float:
+			positions = [position[neighbor] for neighbor in neighbors if neighbor in position]
+			return sum(positions) / len(positions) if positions else position[node]
+		
+		for layer in layers:
+			place(layer)
+		for _ in range(sweeps):
+			for layer in layers[1:]:
+				layer.sort(key=lambda node: barycenter(node, self.ancestors.get(node, ())))
+				place(layer)
+			for layer in layers[-2::-1]:
+				layer.sort(key=lambda node: barycenter(node, self.successors.get(node, ())))
+				place(layer)
+		return layers
+
+	def get_order(self, successors: dict=None) -> list:
+		""" Return the indexes of nodes in topological order with the Kahn's algorithm
+		
+		:param dict successors: successors of nodes indexed by node, if None uses all successors
+			including fictional ones, see :meth:`GraphPert.get_successors`
+		
+		:return: indexes of nodes in topological order
+		:rtype: list
+		
+		If the graph has a cycle a ValueError is raised with the nodes of one cycle
+		"""
+		if successors is None:
+			successors = self.get_successors(fictional=True)
+		
+		degrees = {node: 0 for node in successors}
+		for nodes in successors.values():
+			for node in nodes:
+				degrees[node] += 1
+		
+		order = [node for node, degree in degrees.items() if degree == 0]
+		i = 0
+		while i < len(order):
+			for node in successors[order[i]]:
+				degrees[node] -= 1
+				if degrees[node] == 0:
+					order.append(node)
+			i += 1
+		
+		if len(order) < len(degrees):
+			# each remaining node has a remaining ancestor, go back until a node is found twice
+			remaining = {node for node, degree in degrees.items() if degree > 0}
+			ancestors = {node: [] for node in remaining}
+			for node in remaining:
+				for successor in successors[node]:
+					if successor in remaining:
+						ancestors[successor].append(node)
+			node = min(remaining)
+			path = []
+			while node not in path:
+				path.append(node)
+				node = ancestors[node][0]
+			cycle = path[path.index(node):][::-1]
+			cycle.append(cycle[0])
+			raise ValueError(f"There is a cycle in your graph: {' -> '.join(str(self.nodes[i]) for i in cycle)}")
+		return order
+	
+	def get_pert_order(self, pert: dict) -> list:
+		""" Return the tasks of the pert in topological order
+		
+		Precedences are inserted one by one in a :class:`graphm.topologicalorder.TopologicalOrder`,
+		so a precedence creating a cycle is rejected as soon as it is given, before building the graph
+		
+		:param dict pert: pert definition, see :meth:`GraphPert.set_from_pert`
+		
+		:return: names of tasks in topological order
+		:rtype: list
+		
+		If an ancestor is missing or a precedence creates a cycle a ValueError is raised
+		"""
+		tasks = list(pert)
+		tasks_i = {task: i for i, task in enumerate(tasks)}
+		order = graphm.topologicalorder.TopologicalOrder(len(tasks), nodes=tasks)
+		for task, data in pert.items():
+			for ancestor in self.convert_nodes(data[0]):
+				if ancestor not in tasks_i:
+					raise ValueError(f"The ancestor '{ancestor}' of the task '{task}' is missing")
+				order.add_edge(tasks_i[ancestor], tasks_i[task])
+		return [tasks[i] for i in order.order]
+	
 	def get_successors(self, fictional: bool=False) -> dict:
-		""" get successors from self matrix
+		""" get successors from self successors
 		dict of set
 		"""
 		if fictional:
-			successors = {m: {n for n in range(self.dim) if self.matrix[m][n] != None} for m in range(self.dim)}
+			successors = {m: set(tasks) for m, tasks in self.successors.items()}
 		else:
-			successors = {m: {n for n in range(self.dim) if self.matrix[m][n] != None and isinstance(self.matrix[m][n], str)} for m in range(self.dim)}
+			successors = {m: {n for n, task in tasks.items() if isinstance(task, str)} for m, tasks in self.successors.items()}
 		return successors
 		
 	def get_successors_label(self, fictional: bool=False) -> dict:
-		""" get successors from self matrix
+		""" get successors from self successors
 		dict of set
 		"""
 		if fictional:
-			ancestors = {self.nodes[m]: {self.nodes[n] for n in range(self.dim) if self.matrix[m][n] != None} for m in range(self.dim)}
+			successors = {self.nodes[m]: {self.nodes[n] for n in tasks} for m, tasks in self.successors.items()}
 		else:
-			ancestors = {self.nodes[m]: {self.nodes[n] for n in range(self.dim) if self.matrix[m][n] != None and isinstance(self.matrix[m][n], str)} for m in range(self.dim)}
-		return ancestors
+			successors = {self.nodes[m]: {self.nodes[n] for n, task in tasks.items() if isinstance(task, str)} for m, tasks in self.successors.items()}
+		return successors
 		
 	def group_nodes(self, nodes: list, ancestors: dict) -> tuple:
 		"""
@@ -347,6 +494,9 @@ class GraphPert(graphm.graph.Graph):
 		.. IMPORTANT:: To well understand
 		
 			 Nodes in argument are ancestors of treated node
+		
+		Nodes are visited in the order of their indexes, so ties are broken
+		the same way whatever the order of the given sets
 		"""
 		
 		def get_ref_max_scs(nodes: iter):
@@ -354,12 +504,8 @@ class GraphPert(graphm.graph.Graph):
 			
 			stabilizes the final structure of the graph by optimizing the critical path according to the fictitious paths 
 			"""
-			# get nodes names of successors of all nodes 
-			successors = self.get_successors_label(fictional=True)
-			# get number of successors of nodes (just one for each count)
-			refs_scs = {len(successors[node]): node for node in nodes}
-			# get the name of node of the maximum of successors
-			return refs_scs[max(refs_scs.keys())]
+			# the first node in order of indexes for a tie
+			return max(nodes, key=lambda node: len(self.successors[self.nodes_i[node]]))
 			
 		def get_ref_max_value(nodes: iter):
 			""" Returns the name of the node with the highest task value
@@ -367,27 +513,27 @@ class GraphPert(graphm.graph.Graph):
 			Optimize the graph by avoiding the passage of critical paths by a fictitious path
 			Stabilize the graph by taking the same path
 			"""
-			# get nodes names of successors of all nodes 
-			values = {self.tasks_value[i]: i for i in nodes}
-			return values[max(values.keys())]
+			# the first node in order of indexes for a tie
+			return max(nodes, key=self.tasks_value.get)
 			
 		ref = None
 		merged = set()
 		fictional = set()
 
+		nodes = sorted(nodes, key=self.nodes_i.get)
 		# set of all nodes in conflict
 		#nodes_all = set(nodes)
-		# counted nodes from ancestors
-		ancestors_all = [ancestor for node in nodes for ancestor in ancestors[node]]
 		# count grouped ancestors by nodes
-		ancestors_count = {ancestor: ancestors_all.count(ancestor) for ancestor in set(ancestors_all)}
-		# ancestors in conflict and its dependent nodes
-		ancestors_conflict_nodes = {ancestor: {node for node in nodes if ancestor in ancestors[node]} for ancestor, count in ancestors_count.items() if count > 1}
+		ancestors_count = Counter(ancestor for node in nodes for ancestor in ancestors[node])
+		# ancestors in conflict and its dependent nodes, in order of indexes
+		ancestors_conflict_nodes = {ancestor: [] for ancestor in sorted(ancestors_count, key=self.nodes_i.get) if ancestors_count[ancestor] > 1}
+		for node in nodes:
+			for ancestor in ancestors[node]:
+				if ancestor in ancestors_conflict_nodes:
+					ancestors_conflict_nodes[ancestor].append(node)
 
-		# counted grouped ancestors
-		nodes_ancestors = [node for node in nodes for ancestor in ancestors[node]]
 		# count grouped nodes by nodes
-		nodes_ancestors_count = {node: nodes_ancestors.count(node) for node in set(nodes_ancestors)}
+		nodes_ancestors_count = {node: len(ancestors[node]) for node in nodes}
 		# nodes for ancestors in conflict if each node don't appears in an other groups of ancestors in conflict
 		ancestors_conflict_nodes_unique = {ancestor: [node for node in nodes if nodes_ancestors_count[node] == 1] for ancestor, nodes in ancestors_conflict_nodes.items()}
 		# counts nodes in groups of ancestors in conflict if group of ancestors in conflict have at least one unique node (ancestors_conflict_nodes_unique)
@@ -395,7 +541,8 @@ class GraphPert(graphm.graph.Graph):
 
 		# nodes with independent ancestors
 		#ancestors_nodes_indy = {ancestor: {node for node in nodes if ancestor in ancestors[node]} for ancestor, count in ancestors_count.items() if count == 1}
-		nodes_indy = {node for node in nodes if node not in {n for l in ancestors_conflict_nodes.values() for n in l}}
+		nodes_conflict = {n for l in ancestors_conflict_nodes.values() for n in l}
+		nodes_indy = [node for node in nodes if node not in nodes_conflict]
 		
 		# ref
 		# merge one node at least for each groups of ancestors in conflict
@@ -414,7 +561,7 @@ class GraphPert(graphm.graph.Graph):
 			ref = get_ref_max_value(nodes_indy)
 		else:
 			# get one node in ancestors_conflict_nodes, the one have the biggest task value
-			ref = get_ref_max_value({node for nodes in ancestors_conflict_nodes.values() for node in nodes})
+			ref = get_ref_max_value(node for node in nodes if node in nodes_conflict)
 		
 		# TODO: Merge one non-unique node in a group with an unique node for this group from another group
 		if ancestors_conflict_nodes:
@@ -443,116 +590,263 @@ class GraphPert(graphm.graph.Graph):
 
 		return (ref, merged, fictional)
 
-	def set_back(self):
-		""" Define value of nodes by a DFS
+	def set_cpm(self) -> None:
+		""" Set times of nodes and tasks with the critical path method
+		
+		Nodes are sorted in topological order, then earliest times are given by a forward pass
+		and latest times by a backward pass, both in O(V+E)
 		
-		.. IMPORTANT:: node here is the numeric value in matrix
+		.. IMPORTANT:: node here is node index
 		
-		do not forget node with end for end !
+		Set :attr:`nodes_values` and :attr:`tasks_times` with for each task:
 		
+			:start_early: (int) earliest start
+			:finish_early: (int) earliest finish
+			:start_late: (int) latest start
+			:finish_late: (int) latest finish
+			:float_total: (int) delay allowed without delaying the project
+			:float_free: (int) delay allowed without delaying any successor
 		"""
-		node_start = 0
+		def value(m: int, n: int) -> int:
+			return self.tasks_value[self.successors[m][n]] if isinstance(self.successors[m][n], str) else 0
+		
 		node_end = self.nodes_i[self.node_end]
-		ancestors = self.get_ancestors(fictional=True)
-		paths = [[node_end]]
-		paths_back = []
+		successors = self.get_successors(fictional=True)
+		# the ending node closes the project
+		successors[node_end] = set()
+		self.order = self.get_order(successors)
+		
+		# forward
+		early = [0] * self.dim
+		for m in self.order:
+			for n in successors[m]:
+				if early[m] + value(m, n) > early[n]:
+					early[n] = early[m] + value(m, n)
+		
+		# backward, nodes without successors finish with the project
+		late = [early[node_end]] * self.dim
+		for m in reversed(self.order):
+			for n in successors[m]:
+				if late[n] - value(m, n) < late[m]:
+					late[m] = late[n] - value(m, n)
+		
+		# index, value_down, value_back
+		self.nodes_values = {i: [i, early[i], late[i]] for i in range(self.dim)}
+		self.order_i = {node: i for i, node in enumerate(self.order)}
+		self.tasks_edges = {}
+		for m in self.order:
+			for n in successors[m]:
+				task = self.successors[m][n]
+				if isinstance(task, str):
+					self.tasks_edges.setdefault(task, []).append((m, n))
+		self.tasks_times = {task: self.get_task_times(task) for task in self.tasks_edges}
 
-		while paths:
-			paths_tmp = paths
-			paths = []
-			for path in paths_tmp:
-				node_successor = path[-1]
-				nodes = ancestors[node_successor]
+	def get_task_times(self, task: str) -> dict:
+		""" Return the times of a task from the times of nodes, see :meth:`GraphPert.set_cpm`
+		
+		A task on many edges keeps the times of its first edge in topological order with the lowest float
+		
+		:param str task: name of the task
+		
+		:return: times of the task
+		:rtype: dict
+		"""
+		duration = self.tasks_value[task]
+		times = None
+		for m, n in self.tasks_edges[task]:
+			early = self.nodes_values[m][1]
+			late = self.nodes_values[n][2]
+			if times is None or late - duration - early < times['float_total']:
+				times = {
+					'start_early': early,
+					'finish_early': early + duration,
+					'start_late': late - duration,
+					'finish_late': late,
+					'float_total': late - duration - early,
+					'float_free': self.nodes_values[n][1] - early - duration,
+					}
+		return times
 
-				for node in nodes:
-					if node != node_end:
-						# nodes
-						self.add_node_value_back(node_successor, node)
-						
-						# cycle
-						if node in path:
-							# TODO9: replace old one
-							#exit(f"There is a ascending cycle in your graph:  {' '.join(str(i) for i in path)} -> {node}")
-							raise ValueError(f"There is a backing cycle in your graph: {' '.join(str(i) for i in path)} -> {node}")
-					
-						# paths
-						if node == node_start:
-							paths_back.append(path + [node])
-						else:
-							paths.append(path + [node])
-							
-		self.paths_back = {tuple(i) for i in paths_back}
+	def update_duration(self, task: str, value: int) -> None:
+		""" Update the duration of a task and the schedule without rebuilding the graph
+		
+		Earliest times are propagated only through the nodes downstream of the task and
+		latest times only through the nodes upstream of it, both in topological order with a heap.
+		Times of tasks and critical edges are updated for the changed nodes only.
+		
+		If the duration of the project changes, all latest times and floats are shifted.
+		When the project ends sooner, the critical subgraph is set again with :meth:`GraphPert.set_critical`
+		
+		.. IMPORTANT:: node here is node index
+		
+		:param str task: name of the task
+		:param int value: new duration of the task
+		"""
+		if task not in self.tasks_edges:
+			raise ValueError(f"The task '{task}' is not in the pert")
+		if value == self.tasks_value[task]:
+			return
+		self.tasks_value[task] = value
+		
+		def value_edge(m: int, n: int) -> int:
+			return self.tasks_value[self.successors[m][n]] if isinstance(self.successors[m][n], str) else 0
+		
+		node_end = self.nodes_i[self.node_end]
+		nodes_changed = set()
+		
+		# forward through the downstream cone
+		heap = [(self.order_i[n], n) for n in {n for _, n in self.tasks_edges[task]}]
+		heapq.heapify(heap)
+		queued = {n for _, n in heap}
+		while heap:
+			_, n = heapq.heappop(heap)
+			early = max([0] + [self.nodes_values[m][1] + value_edge(m, n) for m in self.ancestors[n] if m != node_end])
+			if early != self.nodes_values[n][1]:
+				self.nodes_values[n][1] = early
+				nodes_changed.add(n)
+				if n != node_end:
+					for s in self.successors[n]:
+						if s not in queued:
+							queued.add(s)
+							heapq.heappush(heap, (self.order_i[s], s))
+		
+		# the project ends later or sooner, all latest times are shifted
+		duration = self.nodes_values[node_end][1]
+		shift = duration - self.nodes_values[node_end][2]
+		if shift:
+			for data in self.nodes_values.values():
+				data[2] += shift
+			for times in self.tasks_times.values():
+				times['start_late'] += shift
+				times['finish_late'] += shift
+				times['float_total'] += shift
+		
+		# backward through the upstream cone
+		heap = [(-self.order_i[m], m) for m in {m for m, _ in self.tasks_edges[task]}]
+		heapq.heapify(heap)
+		queued = {m for _, m in heap}
+		while heap:
+			_, m = heapq.heappop(heap)
+			successors = self.successors[m] if m != node_end else {}
+			late = min([duration] + [self.nodes_values[n][2] - value_edge(m, n) for n in successors])
+			if late != self.nodes_values[m][2]:
+				self.nodes_values[m][2] = late
+				nodes_changed.add(m)
+				for a in self.ancestors[m]:
+					if a != node_end and a not in queued:
+						queued.add(a)
+						heapq.heappush(heap, (-self.order_i[a], a))
+		
+		# times of tasks touching the changed nodes
+		edges = {(m, n) for m, n in self.tasks_edges[task]}
+		for node in nodes_changed:
+			if node != node_end:
+				edges.update((node, n) for n in self.successors[node])
+			edges.update((m, node) for m in self.ancestors[node] if m != node_end)
+		tasks = {self.successors[m][n] for m, n in edges if isinstance(self.successors[m][n], str)}
+		for t in tasks:
+			self.tasks_times[t] = self.get_task_times(t)
+		
+		# critical subgraph, if the project ends sooner edges anywhere can become critical
+		if shift < 0:
+			self.set_critical()
+			return
+		# if the project ends later only edges touching the changed nodes can stay critical
+		changed = shift > 0 and bool(self.edges_critical)
+		if shift > 0:
+			for m, n in self.edges_critical:
+				self.successors_critical[m].discard(n)
+			self.edges_critical = set()
+			self.nodes_critical = set()
+		for node in nodes_changed:
+			if self.nodes_values[node][1] == self.nodes_values[node][2]:
+				self.nodes_critical.add(node)
+			else:
+				self.nodes_critical.discard(node)
+		for m, n in edges:
+			critical = self.nodes_values[n][2] - self.nodes_values[m][1] - value_edge(m, n) == 0
+			if critical != ((m, n) in self.edges_critical):
+				changed = True
+				if critical:
+					self.successors_critical[m].add(n)
+					self.edges_critical.add((m, n))
+				else:
+					self.successors_critical[m].discard(n)
+					self.edges_critical.discard((m, n))
+		if changed:
+			self.set_path_unique()
 
 	def set_critical(self):
 		""" get the best critical path ;o)
+		
+		Critical edges are those with a null float, they give the critical subgraph.
+		The unique critical path is the one with the fewest edges, found by a breadth-first search
+		in the critical subgraph. All critical paths are given by :meth:`GraphPert.get_paths_critical`
+		
+		.. IMPORTANT:: node here is node index
 		"""
-		def iscritical(node_start: int, node_end: int) -> bool:
-			ve = self.tasks_value[self.matrix[node_start][node_end]] if isinstance(self.matrix[node_start][node_end], str) else 0
-			return self.nodes_values[node_start][1] + ve == self.nodes_values[node_end][1]
-				
+		def value(m: int, n: int) -> int:
+			return self.tasks_value[self.successors[m][n]] if isinstance(self.successors[m][n], str) else 0
+		
+		node_end = self.nodes_i[self.node_end]
+		successors = self.get_successors(fictional=True)
+		successors[node_end] = set()
+		
 		self.nodes_critical = {node for node, data in self.nodes_values.items() if data[1] == data[2]}
-		paths_critical = set()
+		self.successors_critical = {
+			m: {n for n in nodes if self.nodes_values[n][2] - self.nodes_values[m][1] - value(m, n) == 0}
+			for m, nodes in successors.items()
+			}
+		self.edges_critical = {(m, n) for m, nodes in self.successors_critical.items() for n in nodes}
 		
-		for path in self.paths_down:
-			add = True
-			for i in range(1, len(path)):
-				if path[i] not in self.nodes_critical or not iscritical(path[i-1], path[i]):
-					add = False
-					break
-			if add:
-				paths_critical.add(path)
+		self.set_path_unique()
+	
+	def set_path_unique(self) -> None:
+		""" Set the critical path with the fewest edges by a breadth-first search in the critical subgraph
 		
-		# paths		
-		self.paths_critical = {}
-		self.edges_critical = set()
-		for path in paths_critical:
-			self._dict_add(self.paths_critical,len(path), path)
-			self.edges_critical.update((path[i-1], path[i]) for i in range(1, len(path)))
-		self.path_unique = next(iter(self.paths_critical[min(self.paths_critical.keys())]))
+		.. IMPORTANT:: node here is node index
+		"""
+		node_end = self.nodes_i[self.node_end]
+		# breadth-first search of the shortest critical path
+		ancestor = {0: None}
+		nodes = [0]
+		while nodes and node_end not in ancestor:
+			nodes_tmp = nodes
+			nodes = []
+			for m in nodes_tmp:
+				for n in sorted(self.successors_critical[m]):
+					if n not in ancestor:
+						ancestor[n] = m
+						nodes.append(n)
 		
-	def set_down(self):
-		""" Define value of nodes by a DFS
+		path = []
+		node = node_end if node_end in ancestor else None
+		while node is not None:
+			path.append(node)
+			node = ancestor[node]
+		self.path_unique = tuple(reversed(path))
+	
+	def get_paths_critical(self) -> iter:
+		""" Generate lazily all critical paths from the starting node to the ending one
+		
+		Paths are generated by a depth-first search in the critical subgraph
+		given by :meth:`GraphPert.set_critical`
 		
-		.. IMPORTANT:: node here is the numeric value in matrix
+		.. IMPORTANT:: node here is node index
 		
+		:return: a generator of critical paths
+		:rtype: iter(tuple)
 		"""
 		node_end = self.nodes_i[self.node_end]
-		nodes_visited = {0}
-		paths = [[0]]
-		paths_down = []
-		successors = self.get_successors(fictional=True)
-		# index, value_down, value_back
-		self.nodes_values = {i: [i, 0, -1] for i in range(self.dim)}
-		self.nodes_values[0] = [0,0,-1]
-		
+		paths = [(0,)]
 		while paths:
-			paths_tmp = paths
-			paths = []
-			for path in paths_tmp:
-				node_ancestor = path[-1]
-				nodes = successors[node_ancestor]
-					
-				for node in nodes:
-					# cycle
-					if node in path and node != node_end:
-						# TODO: replace old one
-						# exit(f"There is a descending cycle in your graph: {' '.join(str(i) for i in path)} -> {node}")
-						raise ValueError(f"There is a descending cycle in your graph: {' '.join(str(i) for i in path)} -> {node}")
-					
-					# nodes
-					nodes_visited.add(node)
-					self.add_node_value_down(node_ancestor, node)
-
-					# paths
-					if node != node_end:
-						paths.append(path + [node])
-					else:
-						paths_down.append(path + [node])
-						
-		# close with put the final value for the back
-		self.nodes_values[node_end][2] = self.nodes_values[node_end][1]
-		self.paths_down = {tuple(i) for i in paths_down}
-
+			path = paths.pop()
+			if path[-1] == node_end:
+				yield path
+			else:
+				for node in sorted(self.successors_critical[path[-1]], reverse=True):
+					paths.append(path + (node,))
+		
 	def set_from_pert(self, pert: dict, **d) -> None:
 		""" Set the graph from pert, values and optionally edge names 
 		
@@ -578,44 +872,274 @@ class GraphPert(graphm.graph.Graph):
 			:color_critical: (iter) color for drawing critical path of the Pert graph
 						
 				default: :class:`GraphPert.color_critical`
+			
+			:viz: (bool) if False only the schedule is calculated, see :meth:`GraphPert.get_schedule`,
+				the drawing can be done later with :meth:`GraphPert.render`
+			
+				default: True
+			
+			:pinned: (bool) if True nodes are placed by the graph and drawn by neato, see :meth:`GraphPert.render_pinned`
+			
+				default: False
 
 		"""
 		if not pert:
-			exit("The pert is empty ;o)")
+			raise ValueError("The pert is empty ;o)")
 		if self.node_end not in pert.keys():
-			exit(f"The ending character '{self.node_end}' is missing")
+			raise ValueError(f"The ending character '{self.node_end}' is missing")
 		
 		# comes from the arguments given otherwise from the graph 
 		self.node_start = d['node_start'] if 'node_start' in d else GraphPert.node_start
 		self.node_end = d['node_end'] if 'node_end' in d else GraphPert.node_end
 		self.sep = d['sep'] if 'sep' in d else GraphPert.sep
 		self.color_critical = d['color_critical'] if 'color_critical' in d else GraphPert.color_critical
+		# cycles are rejected before building
+		self.get_pert_order(pert)
 		# simple initialization
 		self.nodes_values = {}
-		# downing paths of edges
-		self.paths_down = []
-		# backing paths of edges
-		self.paths_back = []
 
 		# initialize
 		self.set_matrix(pert)
-		if not self.matrix:
-			exit("The data of pert is empty ;o)")
+		if not self.successors:
+			raise ValueError("The data of pert is empty ;o)")
 
 		# generate
 		self.matrix_reduce()
-		self.set_down()
-		self.set_back()
+		self.set_cpm()
 		self.set_ranks()
+		self.set_critical()
+		self.set_nodes_index()
 		#drawing
+		if self.viz is not None:
+			if d.get('pinned', False):
+				self.render_pinned()
+			else:
+				self.render()
+	
+	def get_schedule(self) -> dict:
+		""" Return the schedule of the pert without drawing
+		
+		.. IMPORTANT:: nodes here are labels of nodes
+		
+		:return: the schedule
+		:rtype: dict
+		
+			:duration: (int) duration of the project
+			:tasks: (dict) times of tasks indexed by task, see :meth:`GraphPert.set_cpm`
+			:nodes: (dict) for each node: index, earliest time, latest time and rank
+			:ranks: (dict) nodes of each rank
+			:critical: (set) tasks with a null total float
+			:path_unique: (list) nodes of the critical path with the fewest edges
+		"""
+		ranks = {node: rank for rank, nodes in self.ranks.items() for node in nodes}
+		return {
+			'duration': self.nodes_values[self.nodes_i[self.node_end]][1],
+			'tasks': {task: times.copy() for task, times in self.tasks_times.items()},
+			'nodes': {
+				self.nodes[node]: {
+					'index': index,
+					'time_early': early,
+					'time_late': late,
+					'rank': ranks.get(node),
+					}
+				for node, (index, early, late) in self.nodes_values.items()
+				},
+			'ranks': {rank: sorted(self.nodes[node] for node in nodes) for rank, nodes in self.ranks.items()},
+			'critical': {task for task, times in self.tasks_times.items() if times['float_total'] == 0},
+			'path_unique': [self.nodes[node] for node in self.path_unique],
+			}
+	
+	def get_network(self) -> dict:
+		""" Return the network of the pert in a plain dictionary, without reference to the graph
+		
+		Used by :meth:`GraphPert.get_cpm_batch` and easy to send to other processes
+		
+		.. IMPORTANT:: nodes here are node indexes
+		
+		:return: the network
+		:rtype: dict
+		
+			:dim: (int) number of nodes
+			:node_end: (int) index of the ending node
+			:order: (list) indexes of nodes in topological order
+			:tasks: (list) names of tasks, their positions give the columns of durations
+			:values: (list) durations of tasks
+			:edges: (list) edges in tuple (m, n, t) with t the position of task or -1 for fictional tasks
+		"""
+		node_end = self.nodes_i[self.node_end]
+		tasks = list(self.tasks_times)
+		tasks_i = {task: i for i, task in enumerate(tasks)}
+		edges = [
+			(m, n, tasks_i[task] if isinstance(task, str) else -1)
+			for m in self.order if m != node_end
+			for n, task in self.successors[m].items()
+			]
+		return {
+			'dim': self.dim,
+			'node_end': node_end,
+			'order': self.order[:],
+			'tasks': tasks,
+			'values': [self.tasks_value[task] for task in tasks],
+			'edges': edges,
+			}
+	
+	def get_schedule_batch(self, durations) -> dict:
+		""" Return the durations of project and the criticality of tasks for many scenarios of durations
+		
+		:param array durations: durations of tasks for each scenario in an array (scenarios x tasks),
+			columns are given by the tasks of :meth:`GraphPert.get_network`
+		
+		:return: see :meth:`GraphPert.get_cpm_batch`
+		:rtype: dict
+		"""
+		return GraphPert.get_cpm_batch(self.get_network(), durations)
+	
+	@staticmethod
+	def get_cpm_batch(network: dict, durations) -> dict:
+		""" Return the durations of project and the criticality of tasks for many scenarios of durations
+		
+		The forward and backward passes of the critical path method are made once in topological order,
+		each node calculates its times for all scenarios at once with numpy
+		
+		.. NOTE:: Requires numpy
+		
+		:param dict network: network of the pert, see :meth:`GraphPert.get_network`
+		:param array durations: durations of tasks for each scenario in an array (scenarios x tasks)
+		
+		:return: the results for all scenarios
+		:rtype: dict
+		
+			:duration: (numpy.ndarray) duration of project for each scenario
+			:critical: (numpy.ndarray) boolean array (scenarios x tasks), True if the task is critical in the scenario
+			:criticality: (dict) frequency of each task to be critical indexed by task
+		"""
+		import numpy
+		
+		durations = numpy.asarray(durations, dtype=float)
+		if durations.ndim == 1:
+			durations = durations.reshape(1, -1)
+		scenarios, count = durations.shape
+		if count != len(network['tasks']):
+			raise ValueError(f"Durations have {count} tasks instead of {len(network['tasks'])}")
+		
+		# durations by task in rows, the last one is null for fictional tasks
+		values = numpy.vstack((durations.T, numpy.zeros((1, scenarios))))
+		ancestors = {node: ([], []) for node in network['order']}
+		successors = {node: ([], []) for node in network['order']}
+		for m, n, t in network['edges']:
+			ancestors[n][0].append(m)
+			ancestors[n][1].append(t)
+			successors[m][0].append(n)
+			successors[m][1].append(t)
+		
+		# forward
+		early = numpy.zeros((network['dim'], scenarios))
+		for node in network['order']:
+			nodes, tasks = ancestors[node]
+			if nodes:
+				early[node] = (early[nodes] + values[tasks]).max(axis=0)
+		
+		# backward, nodes without successors finish with the project
+		duration = early[network['node_end']]
+		late = numpy.tile(duration, (network['dim'], 1))
+		for node in reversed(network['order']):
+			nodes, tasks = successors[node]
+			if nodes:
+				late[node] = (late[nodes] - values[tasks]).min(axis=0)
+		
+		# critical tasks have a null total float
+		critical = numpy.zeros((scenarios, count), dtype=bool)
+		for m, n, t in network['edges']:
+			if t >= 0:
+				critical[:, t] |= numpy.isclose(late[n] - values[t] - early[m], 0)
+		
+		return {
+			'duration': duration,
+			'critical': critical,
+			'criticality': dict(zip(network['tasks'], critical.mean(axis=0).tolist())),
+			}
+	
+	def render(self, **d) -> None:
+		""" Add the critical path, nodes, edges and timeline of the schedule to the viz
+		
+		The viz is created if the graph has been calculated without it
+		
+		:param dict \*\*d: options for :class:`pygraphviz.AGraph`, see :meth:`graphm.graph.Graph.set_viz`
+		"""
+		if self.viz is None:
+			graphm.graph.Graph.set_viz(self, **d)
 		self.add_critical()
 		self.add_nodes()
 		self.add_edges()
 		self.add_timeline()
-		print(self.viz)
-		self.draw('files/pert_first.svg', ext='svg')
+	
+	def render_pinned(self, sweeps: int=4, splines: str='line', **d) -> None:
+		""" Add the critical path, nodes, edges and timeline to the viz with the positions of nodes
+		
+		Nodes are placed by rank from left to right and in the order of :meth:`GraphPert.get_layers`
+		inside a rank, the ranks and the crossings are not calculated again by dot.
+		The layout of the graph becomes the engine 'nop2', like 'neato -n2', which keeps positions and only draws edges
+		
+		:param int sweeps: number of sweeps to order nodes inside ranks
+		
+			default = 4
+		
+		:param str splines: drawing of edges: 'line', 'polyline', 'ortho' or 'spline'
+		
+			default = 'line'
+		
+		:param dict \*\*d: options for :class:`pygraphviz.AGraph`, see :meth:`graphm.graph.Graph.set_viz`
+		
+		>>> g = GraphPert(pert={'A': ('', 2), 'B': ('', 3), 'C': ('A,B', 1), '<': ('C', 0)}, viz=False)
+		>>> g.render_pinned()
+		>>> g.layout
+		{'prog': 'nop2'}
+		>>> g.viz.get_node(0).attr['pos'], g.viz.get_node('r0').attr['pos']
+		('25.2,68.4', '25.2,198.0')
+		"""
+		if self.viz is None:
+			graphm.graph.Graph.set_viz(self, **d)
+		layers = self.get_layers(sweeps)
+		
+		# sizes in points, from attributes of viz
+		width = float(self.viz.node_attr.get('width') or 0.7) * 72
+		step_x = width + float(str(self.viz.graph_attr.get('ranksep') or 1).split()[0]) * 72
+		step_y = width + float(self.viz.graph_attr.get('nodesep') or 0.5) * 72
+		height = max(len(layer) for layer in layers)
+		
+		self.add_critical()
+		for layer in layers:
+			for node in layer:
+				if node not in self.nodes_critical:
+					self.add_node_viz(self.viz, node)
+		self.add_edges()
 		
-		print('gag')
+		# the first node of a rank is on top, ranks are centered
+		for rank, layer in enumerate(layers):
+			for i, node in enumerate(layer):
+				x = rank * step_x + width / 2
+				y = ((height + len(layer)) / 2 - 1 - i) * step_y + width / 2
+				self.viz.get_node(node).attr['pos'] = f"{round(x, 1)},{round(y, 1)}"
+		
+		# timeline over the ranks
+		for rank in range(len(layers)):
+			self.viz.add_node(f"r{rank}", width=0.5, pos=f"{round(rank * step_x + width / 2, 1)},{round(height * step_y + width / 2, 1)}")
+		for rank in range(1, len(layers)):
+			self.viz.add_edge(f"r{rank - 1}", f"r{rank}", label=rank)
+		
+		self.viz.graph_attr['splines'] = splines
+		# arguments of programs are not given to the layouts made in process, 'nop2' is 'neato -n2'
+		self.layout = {'prog': 'nop2'}
+
+	def set_viz(self, **d) -> None:
+		""" Set instance of :class:`pygraphviz.AGraph` with viz properties, see :meth:`graphm.graph.Graph.set_viz`
+		
+		With the option 'viz' to False, no instance is created and viz is None
+		"""
+		if d.get('viz', True):
+			super().set_viz(**d)
+		else:
+			self.viz = None
 		
 	def matrix_reduce(self):
 		
@@ -632,16 +1156,25 @@ class GraphPert(graphm.graph.Graph):
 		graph_nodes.append(copyn(self.nodes))
 		"""
 		
+		# nodes with ancestors changed since the last update of ancestors
+		nodes_changed = set()
+		
 		ancestors2group = {n: a for n, a in ancestors.items() if len(a) > 1}
 		for node, nodes_ancestor in ancestors2group.items():
 			node_ref, nodes_merged, nodes_fictional = self.group_nodes(nodes_ancestor, ancestors)
 			
 			if nodes_fictional:
 				self.matrix_add_fictionals(node_ref, nodes_fictional, node)
+				nodes_changed.update((node_ref, node))
 			if nodes_merged:
 				nodes_merged_all.update(nodes_merged)
+				nodes_changed.update(nodes_merged, (node_ref, node))
+				nodes_changed.update(self.nodes[n] for merged in nodes_merged for n in self.successors[self.nodes_i[merged]])
 				self.matrix_merge_nodes(node_ref, nodes_merged, node)
-				ancestors = self.get_ancestors_label()
+				# update ancestors of changed nodes only
+				for changed in nodes_changed:
+					ancestors[changed] = {self.nodes[m] for m, task in self.ancestors[self.nodes_i[changed]].items() if isinstance(task, str)}
+				nodes_changed = set()
 		
 		new_end = ancestors[self.node_end].pop() if len(ancestors[self.node_end]) == 1 else None
 		self.matrix_reduce_nodes(nodes_merged_all, new_end)
@@ -669,17 +1202,16 @@ class GraphPert(graphm.graph.Graph):
 		self.tasks_value[self.node_end] = 0
 		# dim
 		self.dim = len(self.nodes)
-		# matrix
-		self.matrix = [[None for _ in range(self.dim)] for _ in range(self.dim)]
+		# adjacency
+		self.successors = {i: {} for i in range(self.dim)}
+		self.ancestors = {i: {} for i in range(self.dim)}
 		for node_end, data in pert.items():
 			nodes_start, _ = data
 			if not nodes_start:
 				nodes_start = self.node_start
 			nodes_start = self.convert_nodes(nodes_start)
 			for node_start in nodes_start:
-				self.matrix[self.nodes_i[node_start]][self.nodes_i[node_end]] = node_end
-				# with value
-				#self.matrix[self.nodes_i[node_start]][self.nodes_i[node_end]] = node_end + str(self.tasks_value[node_end])
+				self.add_task(self.nodes_i[node_start], self.nodes_i[node_end], node_end)
 
 	def set_nodes_index(self, style: str='from_ancestor') -> None:
 		""" Sets index for all nodes
@@ -704,47 +1236,36 @@ class GraphPert(graphm.graph.Graph):
 								indexed.add(node)
 								index += 1
 		
-	def set_ranks(self):
+	def set_ranks(self, compact: bool=False) -> None:
 		""" set ranks for nodes
-		"""
-		def add_last(node, rank, ranks):
-			""" use local parent variables: ranks, node_visited
-			""" 
-			if node in nodes_visited:
-				ranks = {k: v.difference({node}) for k,v in ranks.items()}
-			if rank in ranks:
-				ranks[rank].add(node)
-			else:
-				ranks[rank] = {node}
-			return ranks
 		
+		The rank of a node is the length of the longest path of tasks from the starting node,
+		calculated in topological order in O(V+E). Nodes not reached by tasks are not ranked
+		
+		:param bool compact: if True, nodes are pushed to the latest rank before their successors
+			to shorten edges between ranks
+		
+			default = False
+		"""
 		node_end = self.nodes_i[self.node_end]
 		successors = self.get_successors()
-		ranks = {0: {0}}
-		rank = 0
-		nodes_visited = {0}
-		paths = [[0]]
-
-		while paths:
-			rank += 1
-			paths_tmp = paths
-			paths = []
-			for path in paths_tmp:
-				node_ancestor = path[-1]
-				nodes = successors[node_ancestor]
-
-				for node in nodes:
-					# rank
-					ranks = add_last(node, rank, ranks)
-					nodes_visited.add(node)
-					
-					# paths
-					if node != node_end:
-						paths.append(path + [node])
-		self.ranks = ranks
-				
-
-
-				
-
-
+		successors[node_end] = set()
+		order = self.get_order(successors)
+		
+		ranks_node = {0: 0}
+		for m in order:
+			if m in ranks_node:
+				for n in successors[m]:
+					if ranks_node[m] + 1 > ranks_node.get(n, -1):
+						ranks_node[n] = ranks_node[m] + 1
+		
+		if compact:
+			for m in reversed(order):
+				if m in ranks_node and m not in (0, node_end):
+					ranks_next = [ranks_node[n] for n in successors[m]]
+					if ranks_next:
+						ranks_node[m] = min(ranks_next) - 1
+		
+		self.ranks = {rank: set() for rank in range(max(ranks_node.values()) + 1)}
+		for node, rank in ranks_node.items():
+			self.ranks[rank].add(node)
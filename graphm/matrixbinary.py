@@ -3,9 +3,11 @@ Created on Apr 26, 2021
 
 @author: salem Aguemoun
 '''
+import json
 import random as rnd
 import graphm.factor
 import graphm.amatrix
+import graphm.topologicalorder
 Factor = graphm.factor.Factor
 
 class MatrixBinary(graphm.amatrix.AMatrix):
@@ -17,6 +19,20 @@ class MatrixBinary(graphm.amatrix.AMatrix):
 	
 	.. NOTE:: For inherited class variables see :class:`graphm.amatrix.AMatrix`
 	
+	:var dict closure_costs: calibrated time in seconds of one product of rows by columns
+		for each engine of the closure, indexed by strategy
+	
+		Can be calibrated and saved by the benchmarks, see :meth:`MatrixBinary.closure_costs_load`
+	
+	:var tuple closure_auto: engines chosen by the strategy 'auto'
+	
+		**('reflexive', 'optimized')** / 'matrix' and 'slides' make the products of 'reflexive'
+		and keep in addition the intermediate matrices, so they are never cheaper for the closure alone
+	
+	:var int closure_samples: number of sampled nodes to estimate the deep of the graph
+	
+		**8**
+	
 	.. CAUTION:: Instance variables
 	
 	:var list matrixM: contents binary integers for rows
@@ -24,6 +40,14 @@ class MatrixBinary(graphm.amatrix.AMatrix):
 	:var int dimM: rows number of matrix
 	:var int dimN: columns number of matrix
 	"""
+	closure_costs = {
+		'reflexive': 1.6e-7,
+		'optimized': 2.4e-7,
+		'matrix': 3.0e-7,
+		'slides': 1.9e-7,
+		}
+	closure_auto = ('reflexive', 'optimized')
+	closure_samples = 8
 
 	def __init__(self, **d) -> 'MatrixBinary':
 		""" Set the matrix properties with type given by one in:
@@ -55,6 +79,42 @@ class MatrixBinary(graphm.amatrix.AMatrix):
 	def __deepcopy__(self) -> 'MatrixBinary':
 		return MatrixBinary(matrices=(self.matrixM, self.matrixN))
 	
+	def __getstate__(self) -> tuple:
+		""" Return a compact state of the matrix for pickle
+		
+		Rows are packed in bytes, columns are not kept and are calculated again when unpickled
+		
+		:return: dimensions, packed rows and reflexivity
+		:rtype: tuple
+		
+		>>> m = MatrixBinary(boolean=['00001', '00100', '00010'])
+		>>> m.__getstate__()
+		(3, 5, b'\\x01\\x04\\x02', False)
+		"""
+		size = (self.dimN + 7) // 8
+		rows = b''.join(m.to_bytes(size, 'big') for m in self.matrixM)
+		return (self.dimM, self.dimN, rows, self.isreflexive)
+	
+	def __setstate__(self, state: tuple) -> None:
+		""" Set the matrix from a compact state given by :meth:`MatrixBinary.__getstate__`
+		
+		:param tuple state: dimensions, packed rows and reflexivity
+		
+		>>> import pickle
+		>>> m = MatrixBinary(boolean=['00001', '00100', '00010'])
+		>>> m2 = pickle.loads(pickle.dumps(m))
+		>>> m2 == m and m2.matrixN == m.matrixN
+		True
+		"""
+		dimM, dimN, rows, self.isreflexive = state
+		size = (dimN + 7) // 8
+		self._set_dim(dimM, dimN)
+		if size:
+			self.matrixM = [int.from_bytes(rows[i:i + size], 'big') for i in range(0, dimM * size, size)]
+		else:
+			self.matrixM = [0] * dimM
+		self.matrixM2N()
+	
 	def __add__(self, matrix: object) -> 'MatrixBinary':
 		""" Return the result of a logical '|'  between values of instance and that passed in argument
 		
@@ -147,6 +207,195 @@ class MatrixBinary(graphm.amatrix.AMatrix):
 		return f"dim {self.dimM},{self.dimN}" +"\n" \
 			+ "\n".join(MatrixBinary.get_int2str(m, self.dimN) for m in self.matrixM)
 
+	def add_edge(self, m: int, n: int, order: 'graphm.topologicalorder.TopologicalOrder'=None) -> None:
+		""" Add the edge m -> n in rows and columns
+		
+		With an order, the edge is inserted first in the order and rejected if it creates a cycle,
+		the matrix is then kept acyclic, see :meth:`MatrixBinary.get_order`
+		
+		:param int m: row of the edge
+		:param int n: column of the edge
+		:param TopologicalOrder order: topological order of the nodes of the matrix
+		
+			default = None / the edge is added without checking cycles
+		
+		>>> m = MatrixBinary(boolean=['010', '001', '000'])
+		>>> order = m.get_order()
+		>>> m.add_edge(0, 2, order)
+		>>> print(m)
+		dim 3,3
+		011
+		001
+		000
+		>>> m.add_edge(2, 0, order)
+		Traceback (most recent call last):
+		...
+		ValueError: The edge 2 -> 0 creates a cycle: 2 -> 0 -> 2
+		"""
+		if order is not None:
+			order.add_edge(m, n)
+		self.matrixM[m] |= 1 << (self.dimN - n - 1)
+		self.matrixN[n] |= 1 << (self.dimM - m - 1)
+
+	def closure(self, strategy: str='auto', executor=None) -> dict:
+		""" Return the reflexive transitive closure of itself in a new matrix
+		calculated by the engine given by the strategy
+		
+		With strategy 'auto', the engine with the cheapest estimated cost is chosen
+		in :attr:`MatrixBinary.closure_auto`, see :meth:`MatrixBinary.closure_estimate`.
+		A given strategy is used without estimation
+		
+		:param str strategy: engine used to calculate the closure: 'auto', 'reflexive', 'optimized', 'matrix' or 'slides'
+		
+			default = 'auto'
+		
+		:param object executor: an executor for the strategy 'optimized', see :meth:`MatrixBinary.closure_reflexive_optimized`
+		
+			default = None
+		
+		:return: the result of the engine with following added indexes
+		:rtype: dict
+		
+			:strategy: (str) the engine used
+			:cost: (float) the estimated cost of the engine in seconds, None if the strategy is given
+		
+		>>> m = MatrixBinary(boolean=['00001', '00100', '00010', '01010', '00010'])
+		>>> result = m.closure()
+		>>> result['closure']
+		11111,01110,01110,01110,01111
+		>>> result['strategy'] in MatrixBinary.closure_auto
+		True
+		>>> result = m.closure('slides')
+		>>> result['closure'] == m.closure()['closure'], result['cost']
+		(True, None)
+		"""
+		if strategy != 'auto' and strategy not in MatrixBinary.closure_costs:
+			raise ValueError(f"Unknown strategy for closure: '{strategy}'")
+		
+		cost = None
+		if strategy == 'auto':
+			costs = self.closure_estimate()['costs']
+			strategy = min(costs, key=costs.get)
+			cost = costs[strategy]
+		
+		if strategy == 'reflexive':
+			result = self.closure_reflexive()
+		elif strategy == 'optimized':
+			# the plan of the estimation, see closure_estimate
+			result = self.closure_reflexive_optimized(optimize='soft', chain='window', executor=executor)
+		elif strategy == 'matrix':
+			result = self.closure_matrix(add=True)
+		else:
+			result = self.closure_slides(add=True)
+		
+		result['strategy'] = strategy
+		result['cost'] = cost
+		return result
+	
+	@staticmethod
+	def closure_costs_load(path: str) -> dict:
+		""" Load the calibrated costs of closure engines from a json file
+		and set them in :attr:`MatrixBinary.closure_costs`
+		
+		:param str path: path of the json file
+		
+		:return: the loaded costs
+		:rtype: dict
+		"""
+		with open(path) as f:
+			costs = json.load(f)
+		for strategy, cost in costs.items():
+			if strategy not in MatrixBinary.closure_costs:
+				raise ValueError(f"Unknown strategy for closure: '{strategy}'")
+			MatrixBinary.closure_costs[strategy] = float(cost)
+		return costs
+	
+	@staticmethod
+	def closure_costs_save(path: str, costs: dict=None) -> None:
+		""" Save the costs of closure engines in a json file
+		
+		:param str path: path of the json file
+		:param dict costs: costs to save indexed by strategy, if None saves :attr:`MatrixBinary.closure_costs`
+		
+			default = None
+		
+		>>> import os, tempfile
+		>>> path = os.path.join(tempfile.mkdtemp(), 'closure.json')
+		>>> MatrixBinary.closure_costs_save(path)
+		>>> MatrixBinary.closure_costs_load(path) == MatrixBinary.closure_costs
+		True
+		"""
+		with open(path, 'w') as f:
+			json.dump(costs if costs else MatrixBinary.closure_costs, f, indent=4)
+	
+	def closure_estimate(self, samples: int=0) -> dict:
+		""" Return the estimated costs of the closure engines chosen by the strategy 'auto',
+		see :attr:`MatrixBinary.closure_auto`
+		
+		The deep of the graph is estimated by the highest eccentricity found with breadth-first
+		searches from sampled nodes, each followed by a backward search from the farthest node reached.
+		Costs are the calibrated cost of a product multiplied by the size of the matrix
+		and the number of products needed by each engine: the deep for 'reflexive',
+		the operations of its plan for 'optimized'. Each product compares all rows to all columns,
+		so the density of edges only acts through the deep
+		
+		:param int samples: number of sampled nodes, if 0 uses :attr:`MatrixBinary.closure_samples`
+		
+			default = 0
+		
+		:return: estimation
+		:rtype: dict
+		
+			:deep: (int) estimated deep of the graph
+			:costs: (dict) estimated cost in seconds indexed by strategy
+		
+		>>> m = MatrixBinary(boolean=['0100', '0010', '0001', '0000'])
+		>>> estimate = m.closure_estimate()
+		>>> estimate['deep'], sorted(estimate['costs'])
+		(3, ['optimized', 'reflexive'])
+		"""
+		if self.dimM != self.dimN:
+			raise ValueError("Matrix have wrong dimensions")
+		
+		def sweep(matrixX: list, node: int) -> tuple:
+			# breadth-first search with lines as sets of neighbours
+			# return the eccentricity and the last node reached
+			reached = frontier = last = 1 << (dim - node - 1)
+			eccentricity = 0
+			while frontier:
+				neighbours = 0
+				while frontier:
+					bit = frontier & -frontier
+					neighbours |= matrixX[dim - bit.bit_length()]
+					frontier ^= bit
+				frontier = neighbours & ~reached
+				reached |= frontier
+				if frontier:
+					eccentricity += 1
+					last = frontier
+			return eccentricity, dim - (last & -last).bit_length()
+		
+		dim = self.dimM
+		samples = min(samples if samples else MatrixBinary.closure_samples, dim)
+		nodes = rnd.sample(range(dim), samples) if samples < dim else range(dim)
+		
+		deep = 0
+		for node in nodes:
+			eccentricity, last = sweep(self.matrixM, node)
+			deep = max(deep, eccentricity, sweep(self.matrixN, last)[0])
+		
+		# the iterative engine makes one product by rank: with the unit matrix added, the closure is reached
+		# at the rank deep - 1 and the product of rank deep checks its stabilization
+		products = {
+			'reflexive': max(deep, 1),
+			# the same plan as the engine run by closure()
+			'optimized': Factor(max(dim - 1, 1), optimize='soft', chain='window').operations(),
+			}
+		return {
+			'deep': deep,
+			'costs': {strategy: MatrixBinary.closure_costs[strategy] * dim * dim * products[strategy] for strategy in MatrixBinary.closure_auto},
+			}
+
 	def closure_reflexive(self, full=False) -> dict:
 		""" Return the transitive closure of itself in a new matrix
 		using an internal optimized product
@@ -189,12 +438,27 @@ class MatrixBinary(graphm.amatrix.AMatrix):
 			'deep': deep,
 			}
 
-	def closure_reflexive_optimized(self, optimize='soft') -> dict:
+	def closure_reflexive_optimized(self, optimize='soft', executor=None, chain: str='') -> dict:
 		""" Return the transitive closure of itself in a new matrix
 		using class :class:`Factor` to optimize products
 		
 		If argument 'full' is False, the transitive closure stop when closure(d) = closure(d-1)
 		
+		:param str optimize: the method used to optimize the product: None, 'soft' or 'hard'
+		
+			default = 'soft'
+		
+		:param object executor: a :class:`concurrent.futures.Executor` or a number of processes
+			to calculate independent products concurrently, at most 2 at a time and none with a chain,
+			see :meth:`Factor.power`
+		
+			default = None
+		
+		:param str chain: the method used to plan the product with an addition chain: None, 'window' or 'shortest',
+			see :class:`Factor`
+		
+			default = None
+		
 		:return: The transitive closure with a deep of stabilized closure
 		:rtype: MatrixBinary
 		
@@ -210,8 +474,8 @@ class MatrixBinary(graphm.amatrix.AMatrix):
 		matrix.matrixM = MatrixBinary.get_matrixX_united(self.matrixM, self.dimM)
 		matrix.matrixN = MatrixBinary.get_matrixX_united(self.matrixN, self.dimN)
 		
-		factor = Factor(self.dimM - 1, optimize=optimize)
-		closure, operations = factor.power(matrix)
+		factor = Factor(self.dimM - 1, optimize=optimize, chain=chain)
+		closure, operations = factor.power(matrix, executor=executor)
 		return {
 			'matrix': self,
 			'closure': closure,
@@ -356,7 +620,178 @@ class MatrixBinary(graphm.amatrix.AMatrix):
 		001,000,111,101,100
 		"""
 		return self.__deepcopy__()
-		
+
+	def get_condensation(self, reduce: bool=True, chains: bool=False) -> dict:
+		""" Return the graph of the strongly connected components, in topological order
+
+		Each component becomes one node, edges between components are weighted by the number
+		of edges they replace. With reduce, only the edges of the transitive reduction are kept,
+		the reachability is the same with the fewest edges: the weight of a removed edge is added
+		to each edge of a kept path between its ends, the path through the first successor reaching
+		its end. With chains, the components linked one by one (out degree 1 to in degree 1
+		in the reduced graph) are merged in one node
+
+		:param bool reduce: keep only the edges of the transitive reduction
+
+			default = True
+
+		:param bool chains: merge the chains of components, needs reduce
+
+			default = False
+
+		:return: the condensed graph with keys:
+
+			:components: (list) indexes of nodes of each component, components in topological order
+			:component: (list) index of component of each node
+			:weights: (dict) number of replaced edges indexed by edge (m, n) between components
+			:condensed: (MatrixBinary) square matrix of edges between components
+
+		:rtype: dict
+
+		>>> m = MatrixBinary(boolean=['0110', '1001', '0001', '0000'])
+		>>> result = m.get_condensation()
+		>>> result['components'], result['weights']
+		([[0, 1], [2], [3]], {(0, 1): 2, (1, 2): 2})
+		>>> result['condensed']
+		010,001,000
+		>>> m.get_condensation(reduce=False)['weights']
+		{(0, 1): 1, (0, 2): 1, (1, 2): 1}
+		>>> m.get_condensation(chains=True)['components']
+		[[0, 1, 2, 3]]
+		"""
+		if self.dimM != self.dimN:
+			raise ValueError(f"The matrix is not square: {self.dimM},{self.dimN}")
+		dim = self.dimN
+
+		successors = [[] for _ in range(dim)]
+		for m, n in MatrixBinary.iter_edges(self.matrixM, dim):
+			successors[m].append(n)
+
+		# Tarjan without recursion, components are found from the sinks
+		index = [-1] * dim
+		low = [0] * dim
+		stacked = [False] * dim
+		stack = []
+		components = []
+		count = 0
+		for root in range(dim):
+			if index[root] >= 0:
+				continue
+			index[root] = low[root] = count
+			count += 1
+			stack.append(root)
+			stacked[root] = True
+			calls = [(root, iter(successors[root]))]
+			while calls:
+				node, nodes = calls[-1]
+				for successor in nodes:
+					if index[successor] < 0:
+						index[successor] = low[successor] = count
+						count += 1
+						stack.append(successor)
+						stacked[successor] = True
+						calls.append((successor, iter(successors[successor])))
+						break
+					if stacked[successor] and index[successor] < low[node]:
+						low[node] = index[successor]
+				else:
+					calls.pop()
+					if calls and low[node] < low[calls[-1][0]]:
+						low[calls[-1][0]] = low[node]
+					if low[node] == index[node]:
+						component = []
+						while True:
+							member = stack.pop()
+							stacked[member] = False
+							component.append(member)
+							if member == node:
+								break
+						components.append(sorted(component))
+		components.reverse()
+
+		component = [0] * dim
+		for c, members in enumerate(components):
+			for node in members:
+				component[node] = c
+		weights = {}
+		for m in range(dim):
+			for n in successors[m]:
+				edge = (component[m], component[n])
+				if edge[0] != edge[1]:
+					weights[edge] = weights.get(edge, 0) + 1
+
+		if reduce:
+			# from the sinks, an edge is redundant if its end is reached by a nearer successor
+			dimC = len(components)
+			successorsC = [[] for _ in range(dimC)]
+			for m, n in weights:
+				successorsC[m].append(n)
+			reach = [0] * dimC
+			kept = [[] for _ in range(dimC)]
+			pending = [{} for _ in range(dimC)]
+			for m in range(dimC - 1, -1, -1):
+				reached = 0
+				for n in sorted(successorsC[m]):
+					if reached >> n & 1:
+						pending[m][n] = weights.pop((m, n))
+					else:
+						kept[m].append(n)
+						reached |= reach[n] | 1 << n
+				reach[m] = reached
+			# weights of removed edges follow a kept path in topological order, grouped by end
+			for m in range(dimC):
+				for end, weight in sorted(pending[m].items()):
+					n = next(n for n in kept[m] if n == end or reach[n] >> end & 1)
+					weights[(m, n)] += weight
+					if n != end:
+						pending[n][end] = pending[n].get(end, 0) + weight
+				pending[m] = None
+			weights = dict(sorted(weights.items()))
+
+		if chains:
+			if not reduce:
+				raise ValueError("Chains of components need the transitive reduction")
+			degree_in = [0] * len(components)
+			degree_out = [0] * len(components)
+			ancestor = {}
+			for m, n in weights:
+				degree_out[m] += 1
+				degree_in[n] += 1
+				ancestor[n] = m
+			group = []
+			groups = 0
+			for c in range(len(components)):
+				if degree_in[c] == 1 and degree_out[ancestor[c]] == 1:
+					group.append(group[ancestor[c]])
+				else:
+					group.append(groups)
+					groups += 1
+			merged = [[] for _ in range(groups)]
+			for c, members in enumerate(components):
+				merged[group[c]].extend(members)
+			components = [sorted(members) for members in merged]
+			for node in range(dim):
+				component[node] = group[component[node]]
+			weights_merged = {}
+			for (m, n), weight in weights.items():
+				if group[m] != group[n]:
+					edge = (group[m], group[n])
+					weights_merged[edge] = weights_merged.get(edge, 0) + weight
+			weights = weights_merged
+
+		dimC = len(components)
+		matrixM = [0] * dimC
+		matrixN = [0] * dimC
+		for m, n in weights:
+			matrixM[m] |= 1 << (dimC - n - 1)
+			matrixN[n] |= 1 << (dimC - m - 1)
+		return {
+			'components': components,
+			'component': component,
+			'weights': weights,
+			'condensed': MatrixBinary(matrices=(matrixM, matrixN)),
+			}
+
 	@staticmethod
 	def get_edges_count(matrix: 'MatrixBinary') -> int:
 		""" Give the number of edges in matrix
@@ -585,6 +1020,34 @@ class MatrixBinary(graphm.amatrix.AMatrix):
 		return [int('0b' + ''.join(l[n] for l in line), 2) for n in range(dimN)]
 		#return [int('0b' + ''.join(l[n] for l in matrix), 2) for n in range(dim)]
 	
+	def get_order(self) -> 'graphm.topologicalorder.TopologicalOrder':
+		""" Return the topological order of the nodes of the graph given by the matrix
+		
+		Reflexive edges are ignored, the other ones are inserted row by row
+		
+		:return: the topological order, to keep updated with :meth:`MatrixBinary.add_edge`
+		:rtype: TopologicalOrder
+		
+		If the graph has a cycle a ValueError is raised with the nodes of one cycle
+		
+		>>> m = MatrixBinary(boolean=['000', '100', '010'])
+		>>> m.get_order().order
+		[2, 1, 0]
+		
+		>>> m = MatrixBinary(boolean=['010', '001', '100'])
+		>>> m.get_order()
+		Traceback (most recent call last):
+		...
+		ValueError: The edge 2 -> 0 creates a cycle: 2 -> 0 -> 1 -> 2
+		"""
+		if self.dimM != self.dimN:
+			raise ValueError(f"The matrix is not square: {self.dimM},{self.dimN}")
+		order = graphm.topologicalorder.TopologicalOrder(self.dimM)
+		for m, n in MatrixBinary.iter_edges(self.matrixM, self.dimN):
+			if n != m:
+				order.add_edge(m, n)
+		return order
+
 	@staticmethod
 	def get_str2int(line: str) -> int:
 		""" Return the converted binary integer from boolean str,
@@ -724,6 +1187,29 @@ class MatrixBinary(graphm.amatrix.AMatrix):
 				return False
 		return True
 	
+	@staticmethod
+	def iter_edges(matrixM: iter, dimN: int) -> iter:
+		""" Generate the edges of a binary matrix, in O(edges) by extracting the set bits of rows
+		
+		Only the set bits are visited, from the highest one, so columns are given in increasing order.
+		The rows can be generated lazily
+		
+		:param iter matrixM: rows of the matrix in integers
+		:param int dimN: number of columns
+		
+		:return: a generator of edges in tuple (m, n), by row then by column
+		:rtype: iter(tuple)
+		
+		>>> list(MatrixBinary.iter_edges([1, 6, 0], 3))
+		[(0, 2), (1, 0), (1, 1)]
+		"""
+		for m, line in enumerate(matrixM):
+			while line:
+				# the highest set bit is the lowest column
+				length = line.bit_length()
+				yield m, dimN - length
+				line ^= 1 << (length - 1)
+	
 	def matrixM2N(self) -> None:
 		""" set the transpose of the matrixM (list of rows) of itself
 		
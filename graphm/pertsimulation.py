@@ -0,0 +1,356 @@
+'''
+Created on Oct 19, 2026
+'''
+import concurrent.futures
+import graphm.graphpert
+GraphPert = graphm.graphpert.GraphPert
+
+class PertSimulation(object):
+	""" Monte Carlo simulation of the durations of a Pert graph
+	
+	Durations of tasks are sampled from 3 estimates (optimistic, likely, pessimistic),
+	each scenario is calculated with :meth:`GraphPert.get_cpm_batch`.
+	Scenarios are grouped in shards with their own seeds, given by the seed of simulation,
+	so results do not depend on the number of processes.
+	Each shard gives aggregates of a fixed size whatever its number of scenarios: sums, counts of
+	critical tasks and a histogram of project durations between the durations with all optimistic
+	and all pessimistic estimates. Percentiles are read from the histogram, with an error less than
+	the width of one bin
+	
+	.. NOTE:: Requires numpy
+	
+	:var str distribution: default distribution to sample durations
+	
+		**beta** / beta, triangular
+	
+	:var int shard_size: number of scenarios calculated by shard
+	
+		**10000**
+	
+	:var tuple percentiles: percentiles of the project duration given in statistics
+	
+		**(5, 50, 80, 95)**
+	
+	:var int histogram_bins: number of bins of the histogram of project durations
+	
+		**4096**
+	
+	.. CAUTION:: Instance variables
+	
+	:var dict network: network of the pert, see :meth:`GraphPert.get_network`
+	:var list estimates: (optimistic, likely, pessimistic) for each task of the network
+	:var str distribution: distribution to sample durations
+	:var int seed: seed of the simulation
+	
+	>>> g = GraphPert(pert={'A': ('', 2), 'B': ('A', 3), '<': ('B', 0)}, viz=False)
+	>>> simulation = PertSimulation(g, {'A': (1, 2, 5)}, seed=1)
+	>>> statistics = simulation.run(1000)
+	>>> statistics['scenarios'], 4 < statistics['mean'] < 8, 4 <= statistics['percentiles'][5] <= statistics['percentiles'][95] <= 8
+	(1000, True, True)
+	"""
+	distribution = 'beta'
+	shard_size = 10000
+	percentiles = (5, 50, 80, 95)
+	histogram_bins = 4096
+	
+	def __init__(self, graph: GraphPert, estimates: dict=None, distribution: str='', seed: int=0):
+		""" Set the simulation of the graph with estimates of durations
+		
+		:param GraphPert graph: the Pert graph
+		:param dict estimates: tuple (optimistic, likely, pessimistic) indexed by task,
+			for missing tasks the duration of the graph is kept
+		
+			default = None
+		
+		:param str distribution: distribution to sample durations: 'beta' or 'triangular'
+		
+			default: :attr:`PertSimulation.distribution`
+		
+		:param int seed: seed of the simulation
+		
+			default = 0
+		"""
+		self.distribution = distribution if distribution else PertSimulation.distribution
+		if self.distribution not in ('beta', 'triangular'):
+			raise ValueError(f"Unknown distribution: '{self.distribution}'")
+		
+		estimates = estimates if estimates else {}
+		self.network = graph.get_network()
+		self.estimates = []
+		for task, value in zip(self.network['tasks'], self.network['values']):
+			optimistic, likely, pessimistic = estimates[task] if task in estimates else (value, value, value)
+			if not optimistic <= likely <= pessimistic:
+				raise ValueError(f"Wrong estimates for task '{task}': {(optimistic, likely, pessimistic)}")
+			self.estimates.append((optimistic, likely, pessimistic))
+		self.seed = seed
+	
+	@staticmethod
+	def get_samples(estimates: list, scenarios: int, distribution: str, rng) -> 'numpy.ndarray':
+		""" Return sampled durations for tasks
+		
+		For the beta-PERT distribution, with a the optimistic, m the likely and b the pessimistic durations,
+		shapes are 1 + 4 (m - a) / (b - a) and 1 + 4 (b - m) / (b - a)
+		
+		:param list estimates: (optimistic, likely, pessimistic) for each task
+		:param int scenarios: number of scenarios
+		:param str distribution: 'beta' or 'triangular'
+		:param numpy.random.Generator rng: random generator
+		
+		:return: durations in an array (scenarios x tasks)
+		:rtype: numpy.ndarray
+		
+		>>> import numpy
+		>>> samples = PertSimulation.get_samples([(1, 2, 6), (3, 3, 3)], 1000, 'beta', numpy.random.default_rng(0))
+		>>> samples.shape, bool(samples[:, 0].min() >= 1), bool(samples[:, 0].max() <= 6), bool((samples[:, 1] == 3).all())
+		((1000, 2), True, True, True)
+		"""
+		import numpy
+		
+		optimistic, likely, pessimistic = numpy.asarray(estimates, dtype=float).reshape(-1, 3).T
+		width = pessimistic - optimistic
+		# fixed durations are sampled in a unit width and set after
+		fixed = width == 0
+		width[fixed] = 1
+		shape = (scenarios, len(optimistic))
+		
+		if distribution == 'beta':
+			alpha = 1 + 4 * (likely - optimistic) / width
+			beta = 1 + 4 * (pessimistic - likely) / width
+			alpha[fixed] = beta[fixed] = 1
+			samples = optimistic + width * rng.beta(alpha, beta, size=shape)
+		elif distribution == 'triangular':
+			mode = (likely - optimistic) / width
+			mode[fixed] = 0
+			samples = optimistic + width * rng.triangular(0, mode, 1, size=shape)
+		else:
+			raise ValueError(f"Unknown distribution: '{distribution}'")
+		
+		samples[:, fixed] = optimistic[fixed]
+		return samples
+	
+	def get_range(self) -> tuple:
+		""" Return the lowest and highest durations of the project, with all optimistic and all pessimistic estimates
+		
+		Durations of the project are increasing with the durations of tasks, so all scenarios are in this range
+		
+		:return: (lowest, highest) durations of the project
+		:rtype: tuple
+		"""
+		optimistic, _, pessimistic = zip(*self.estimates) if self.estimates else ((), (), ())
+		duration = GraphPert.get_cpm_batch(self.network, [optimistic, pessimistic])['duration']
+		return float(duration[0]), float(duration[1])
+	
+	@staticmethod
+	def merge_shards(shards: list) -> dict:
+		""" Return the aggregates of shards merged in one, in the given order
+		
+		:param list shards: aggregates given by :meth:`PertSimulation.run_shard`, with the same range
+		
+		:return: aggregates of all shards, see :meth:`PertSimulation.run_shard`
+		:rtype: dict
+		"""
+		merged = {
+			'scenarios': shards[0]['scenarios'],
+			'range': shards[0]['range'],
+			'histogram': shards[0]['histogram'].copy(),
+			'critical': shards[0]['critical'].copy(),
+			'sums': dict(shards[0]['sums']),
+			}
+		for shard in shards[1:]:
+			merged['scenarios'] += shard['scenarios']
+			merged['histogram'] += shard['histogram']
+			merged['critical'] += shard['critical']
+			for key, value in shard['sums'].items():
+				merged['sums'][key] = merged['sums'][key] + value
+		return merged
+	
+	@staticmethod
+	def run_shard(network: dict, estimates: list, distribution: str, scenarios: int, seed, bounds: tuple=None) -> dict:
+		""" Return the aggregates of one shard of scenarios
+		
+		Called in other processes, all arguments are plain objects
+		
+		:param dict network: network of the pert, see :meth:`GraphPert.get_network`
+		:param list estimates: (optimistic, likely, pessimistic) for each task of the network
+		:param str distribution: 'beta' or 'triangular'
+		:param int scenarios: number of scenarios
+		:param numpy.random.SeedSequence seed: seed of the shard
+		:param tuple bounds: range of the histogram of project durations, see :meth:`PertSimulation.get_range`
+		
+			default = None / the range of durations of the shard
+		
+		:return: aggregates of the shard, of a fixed size whatever the number of scenarios
+		:rtype: dict
+		
+			:scenarios: (int) number of scenarios
+			:range: (tuple) lowest and highest durations of the histogram
+			:histogram: (numpy.ndarray) number of scenarios in each bin of project durations
+			:critical: (numpy.ndarray) number of scenarios where tasks are critical
+			:sums: (dict) sums to calculate the correlations between durations of tasks and project
+		"""
+		import numpy
+		
+		samples = PertSimulation.get_samples(estimates, scenarios, distribution, numpy.random.default_rng(seed))
+		result = GraphPert.get_cpm_batch(network, samples)
+		duration = result['duration']
+		bounds = bounds if bounds else (float(duration.min()), float(duration.max()))
+		# a duration equal to the highest one is counted in the last bin
+		indexes = numpy.zeros(scenarios, dtype=int)
+		if bounds[1] > bounds[0]:
+			indexes = ((duration - bounds[0]) * (PertSimulation.histogram_bins / (bounds[1] - bounds[0]))).astype(int)
+		return {
+			'scenarios': scenarios,
+			'range': bounds,
+			'histogram': numpy.bincount(numpy.clip(indexes, 0, PertSimulation.histogram_bins - 1), minlength=PertSimulation.histogram_bins),
+			'critical': result['critical'].sum(axis=0),
+			'sums': {
+				'x': samples.sum(axis=0),
+				'xx': (samples * samples).sum(axis=0),
+				'xy': samples.T @ duration,
+				'y': duration.sum(),
+				'yy': duration @ duration,
+				},
+			}
+	
+	@staticmethod
+	def get_percentiles(histogram: 'numpy.ndarray', bounds: tuple, percentiles: iter) -> list:
+		""" Return percentiles from a histogram, linearly interpolated inside bins
+		
+		:param numpy.ndarray histogram: number of values in each bin
+		:param tuple bounds: lowest and highest values of the histogram
+		:param iter percentiles: percentiles between 0 and 100
+		
+		:return: values of the percentiles
+		:rtype: list
+		
+		>>> import numpy
+		>>> PertSimulation.get_percentiles(numpy.array([1, 1, 2]), (0, 3), (25, 50, 100))
+		[1.0, 2.0, 3.0]
+		"""
+		import numpy
+		
+		cumulated = numpy.cumsum(histogram)
+		width = (bounds[1] - bounds[0]) / len(histogram)
+		values = []
+		for percentile in percentiles:
+			target = percentile / 100 * cumulated[-1]
+			i = min(int(numpy.searchsorted(cumulated, target)), len(histogram) - 1)
+			before = cumulated[i - 1] if i else 0
+			part = (target - before) / histogram[i] if histogram[i] else 0
+			values.append(float(bounds[0] + (i + part) * width))
+		return values
+	
+	def get_statistics(self, shards: list) -> dict:
+		""" Return the statistics from aggregates of shards
+		
+		Aggregates have a fixed size, so the statistics cost the same whatever the number of scenarios
+		
+		:param list shards: aggregates given by :meth:`PertSimulation.run_shard` or :meth:`PertSimulation.merge_shards`
+		
+		:return: statistics
+		:rtype: dict
+		
+			:scenarios: (int) number of scenarios
+			:mean: (float) mean of the project duration
+			:std: (float) standard deviation of the project duration
+			:percentiles: (dict) project durations indexed by percentile
+			:criticality: (dict) frequency of each task to be critical indexed by task
+			:sensitivity: (dict) correlation between the duration of each task and the project duration indexed by task
+		"""
+		import numpy
+		
+		merged = PertSimulation.merge_shards(shards)
+		scenarios = merged['scenarios']
+		critical = merged['critical']
+		sums = merged['sums']
+		
+		mean_x = sums['x'] / scenarios
+		mean_y = sums['y'] / scenarios
+		covariance = sums['xy'] / scenarios - mean_x * mean_y
+		variance_x = sums['xx'] / scenarios - mean_x * mean_x
+		variance_y = sums['yy'] / scenarios - mean_y * mean_y
+		with numpy.errstate(divide='ignore', invalid='ignore'):
+			correlation = covariance / numpy.sqrt(variance_x * variance_y)
+		correlation = numpy.where(numpy.isfinite(correlation), correlation, 0)
+		
+		tasks = self.network['tasks']
+		return {
+			'scenarios': scenarios,
+			'mean': float(mean_y),
+			'std': float(numpy.sqrt(max(variance_y, 0))),
+			'percentiles': dict(zip(PertSimulation.percentiles, PertSimulation.get_percentiles(merged['histogram'], merged['range'], PertSimulation.percentiles))),
+			'criticality': dict(zip(tasks, (critical / scenarios).tolist())),
+			'sensitivity': dict(zip(tasks, correlation.tolist())),
+			}
+	
+	def iter_run(self, scenarios: int, executor=None) -> iter:
+		""" Run the simulation and generate the statistics each time a shard is calculated
+		
+		Each shard has its own seed spawned from the seed of simulation, and shards are merged
+		in their order as soon as the previous ones are calculated, so the final statistics are
+		the same whatever the executor. Each merge and each statistics cost the same whatever
+		the number of shards
+		
+		:param int scenarios: number of scenarios
+		:param object executor: a :class:`concurrent.futures.Executor` or a number of processes
+			to calculate shards concurrently, if None shards are calculated in this process
+		
+			default = None
+		
+		:return: a generator of statistics, see :meth:`PertSimulation.get_statistics`
+		:rtype: iter(dict)
+		"""
+		import numpy
+		
+		sizes = [PertSimulation.shard_size] * (scenarios // PertSimulation.shard_size)
+		if scenarios % PertSimulation.shard_size:
+			sizes.append(scenarios % PertSimulation.shard_size)
+		seeds = numpy.random.SeedSequence(self.seed).spawn(len(sizes))
+		args = (self.network, self.estimates, self.distribution)
+		bounds = self.get_range()
+		
+		# shards calculated before the previous ones wait to be merged in order
+		waiting = {}
+		merged = None
+		first = 0
+		def merge(i: int, shard: dict) -> dict:
+			nonlocal merged, first
+			waiting[i] = shard
+			if first not in waiting:
+				return None
+			shards = [merged] if merged else []
+			while first in waiting:
+				shards.append(waiting.pop(first))
+				first += 1
+			merged = PertSimulation.merge_shards(shards)
+			return self.get_statistics([merged])
+		
+		if executor is None:
+			for i, (size, seed) in enumerate(zip(sizes, seeds)):
+				yield merge(i, PertSimulation.run_shard(*args, size, seed, bounds))
+			return
+		
+		pool = concurrent.futures.ProcessPoolExecutor(max_workers=executor) if isinstance(executor, int) else executor
+		try:
+			futures = {pool.submit(PertSimulation.run_shard, *args, size, seed, bounds): i for i, (size, seed) in enumerate(zip(sizes, seeds))}
+			for future in concurrent.futures.as_completed(futures):
+				statistics = merge(futures[future], future.result())
+				if statistics is not None:
+					yield statistics
+		finally:
+			if pool is not executor:
+				pool.shutdown(cancel_futures=True)
+	
+	def run(self, scenarios: int, executor=None) -> dict:
+		""" Run the simulation and return the final statistics
+		
+		:param int scenarios: number of scenarios
+		:param object executor: see :meth:`PertSimulation.iter_run`
+		
+		:return: statistics, see :meth:`PertSimulation.get_statistics`
+		:rtype: dict
+		"""
+		statistics = None
+		for statistics in self.iter_run(scenarios, executor):
+			pass
+		return statistics
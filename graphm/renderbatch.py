@@ -0,0 +1,270 @@
+'''
+Created on Oct 19, 2026
+'''
+import concurrent.futures
+import shlex
+import shutil
+import subprocess
+import time
+import graphm.rendercache
+RenderCache = graphm.rendercache.RenderCache
+
+class RenderBatch(object):
+	""" Draw a batch of graphs concurrently, each one by a layout program running in its own process
+
+	The DOT text of each graph is sent to the layout program, which is killed when its drawing
+	lasts more than the timeout. The graph is then drawn with the next faster layout program.
+	Each result gives the layout program used and the time of each attempt
+
+	:var int timeout: default maximum time in seconds of a layout program for a drawing
+
+		**60**
+
+	:var tuple fallbacks: default layout programs used in order when a drawing lasts too long
+
+		**('sfdp', 'neato')**
+
+	:var dict commands: commands of layout engines without their own program, indexed by engine
+
+		**nop** / neato -n, **nop1** / neato -n1, **nop2** / neato -n2
+
+	.. CAUTION:: Instance variables
+
+	:var float timeout: maximum time in seconds of a layout program for a drawing
+	:var tuple fallbacks: layout programs used in order when a drawing lasts too long
+	:var RenderCache cache: cache of drawings, or None
+	:var list jobs: drawings to make, in dict with keys 'dot', 'path', 'ext' and 'layout'
+
+	>>> import os, tempfile
+	>>> batch = RenderBatch(timeout=10, fallbacks=())
+	>>> batch.add('digraph { A -> B }', os.path.join(tempfile.mkdtemp(), 'a.svg'), 'svg', layout={'prog': 'no_layout'})
+	0
+	>>> result = batch.run()[0]
+	>>> result['status'], result['prog'], [attempt['status'] for attempt in result['attempts']]
+	('error', 'no_layout', ['error'])
+	"""
+	timeout = 60
+	fallbacks = ('sfdp', 'neato')
+	commands = {
+		'nop': ('neato', '-n'),
+		'nop1': ('neato', '-n1'),
+		'nop2': ('neato', '-n2'),
+		}
+
+	def __init__(self, timeout: float=0, fallbacks: tuple=None, cache: RenderCache=None):
+		""" Set an empty batch
+
+		:param float timeout: maximum time in seconds of a layout program for a drawing
+
+			default = :attr:`RenderBatch.timeout`
+
+		:param tuple fallbacks: layout programs used in order when a drawing lasts too long
+
+			default = :attr:`RenderBatch.fallbacks`
+
+		:param RenderCache cache: cache of drawings, the drawings found are not made again
+
+			default = None
+		"""
+		self.timeout = timeout if timeout else RenderBatch.timeout
+		self.fallbacks = tuple(fallbacks) if fallbacks is not None else RenderBatch.fallbacks
+		self.cache = cache
+		self.jobs = []
+
+	def __len__(self) -> int:
+		""" Return the number of drawings
+		"""
+		return len(self.jobs)
+
+	def add(self, graph, path: str, ext: str='png', layout: dict=None) -> int:
+		""" Add a drawing to the batch
+
+		:param graph: a graph with a viz, :class:`graphm.graph.Graph`, :class:`graphm.graphmatrix.GraphM`,
+			:class:`graphm.graphpert.GraphPert`, or a graph in DOT format
+		:param str path: path to write the drawing
+		:param str ext: format of the drawing
+		:param dict layout: arguments of the layout with 'prog' and optionally 'args'
+
+			default = None / the layout of the graph or {'prog': 'dot'}
+
+		:return: index of the drawing in the batch
+		:rtype: int
+		"""
+		if isinstance(graph, str):
+			dot = graph
+		else:
+			if getattr(graph, 'viz', None) is None:
+				raise ValueError("The graph has no viz to draw")
+			dot = RenderCache.get_dot(graph.viz)
+			if layout is None:
+				layout = graph.layout
+
+		self.jobs.append({'dot': dot, 'path': path, 'ext': ext, 'layout': dict(layout) if layout else {'prog': 'dot'}})
+		return len(self.jobs) - 1
+
+	@staticmethod
+	def run_job(job: dict, timeout: float, fallbacks: tuple) -> dict:
+		""" Draw a graph with its layout program, then with the fallbacks in order while the drawing lasts too long
+
+		:param dict job: drawing, see :attr:`RenderBatch.jobs`
+		:param float timeout: maximum time in seconds of a layout program
+		:param tuple fallbacks: layout programs used in order after a timeout
+
+		:return: the result of the drawing with keys:
+
+			:path: (str) path of the drawing
+			:prog: (str) the last layout program used
+			:status: (str) 'ok', 'timeout' or 'error'
+			:error: (str) message of the layout program on error
+			:time: (float) time in seconds of all attempts
+			:attempts: (list) dicts with 'prog', 'status' and 'time' of each attempt
+
+		:rtype: dict
+		"""
+		layout = job['layout']
+		args = shlex.split(layout.get('args', ''))
+		progs = [layout['prog']] + [prog for prog in fallbacks if prog != layout['prog']]
+		dot = job['dot'].encode()
+
+		result = {'path': job['path'], 'prog': '', 'status': '', 'error': '', 'time': 0.0, 'attempts': []}
+		for prog in progs:
+			start = time.perf_counter()
+			try:
+				command = RenderBatch.commands.get(prog, (prog,))
+				subprocess.run([*command, *args, f"-T{job['ext']}", '-o', job['path']], input=dot, capture_output=True, timeout=timeout, check=True)
+				status = 'ok'
+			except subprocess.TimeoutExpired:
+				status = 'timeout'
+			except subprocess.CalledProcessError as e:
+				status = 'error'
+				result['error'] = e.stderr.decode(errors='replace').strip()
+			except OSError as e:
+				status = 'error'
+				result['error'] = str(e)
+			seconds = time.perf_counter() - start
+
+			result['attempts'].append({'prog': prog, 'status': status, 'time': seconds})
+			result['time'] += seconds
+			result['prog'] = prog
+			result['status'] = status
+			# only a timeout gives a chance to a faster layout program
+			if status != 'timeout':
+				break
+		return result
+
+	def get_cached(self, job: dict) -> dict:
+		""" Copy the drawing from cache if it was already made with the layout program or a fallback
+
+		:param dict job: drawing, see :attr:`RenderBatch.jobs`
+
+		:return: the result with the status 'cached', see :meth:`RenderBatch.run_job`, or None if not cached
+		:rtype: dict
+		"""
+		start = time.perf_counter()
+		for prog in [job['layout']['prog']] + list(self.fallbacks):
+			path_cached = self.cache.get(self.get_key(job, prog), job['ext'])
+			if path_cached is not None:
+				shutil.copyfile(path_cached, job['path'])
+				self.cache.hits += 1
+				seconds = time.perf_counter() - start
+				return {'path': job['path'], 'prog': prog, 'status': 'cached', 'error': '', 'time': seconds, 'attempts': []}
+		self.cache.misses += 1
+		return None
+
+	@staticmethod
+	def get_key(job: dict, prog: str) -> str:
+		""" Return the key in cache of a drawing made with a layout program
+
+		:param dict job: drawing, see :attr:`RenderBatch.jobs`
+		:param str prog: layout program
+
+		:return: the key, see :meth:`RenderCache.get_key`
+		:rtype: str
+		"""
+		return RenderCache.get_key(job['dot'], dict(job['layout'], prog=prog), job['ext'])
+
+	def iter_run(self, executor=None) -> iter:
+		""" Draw the graphs and generate the result of each drawing as soon as it is made
+
+		:param object executor: a :class:`concurrent.futures.Executor` or a number of layout programs
+			running concurrently, if None graphs are drawn one by one
+
+			default = None
+
+		:return: a generator of results with the key 'index' of the drawing, see :meth:`RenderBatch.run_job`
+		:rtype: iter(dict)
+		"""
+		jobs = {}
+		for index, job in enumerate(self.jobs):
+			result = self.get_cached(job) if self.cache is not None else None
+			if result is not None:
+				result['index'] = index
+				yield result
+			else:
+				jobs[index] = job
+
+		def done(index: int, result: dict) -> dict:
+			result['index'] = index
+			if self.cache is not None and result['status'] == 'ok':
+				self.cache.put(self.get_key(jobs[index], result['prog']), jobs[index]['ext'], result['path'])
+			return result
+
+		if executor is None:
+			for index, job in jobs.items():
+				yield done(index, RenderBatch.run_job(job, self.timeout, self.fallbacks))
+			return
+
+		# threads only wait for the layout programs, which run in their own processes
+		pool = concurrent.futures.ThreadPoolExecutor(max_workers=executor) if isinstance(executor, int) else executor
+		try:
+			futures = {pool.submit(RenderBatch.run_job, job, self.timeout, self.fallbacks): index for index, job in jobs.items()}
+			for future in concurrent.futures.as_completed(futures):
+				yield done(futures[future], future.result())
+		finally:
+			if pool is not executor:
+				pool.shutdown(cancel_futures=True)
+
+	def run(self, executor=None) -> list:
+		""" Draw the graphs and return the results in the order of the batch
+
+		:param object executor: a :class:`concurrent.futures.Executor` or a number of layout programs
+			running concurrently, see :meth:`RenderBatch.iter_run`
+
+			default = None
+
+		:return: the result of each drawing, see :meth:`RenderBatch.run_job`
+		:rtype: list(dict)
+		"""
+		results = [None] * len(self.jobs)
+		for result in self.iter_run(executor):
+			results[result['index']] = result
+		return results
+
+	@staticmethod
+	def get_statistics(results: list) -> dict:
+		""" Return the number of drawings by status and layout program, and their times
+
+		:param list results: results of drawings, see :meth:`RenderBatch.run`
+
+		:return: statistics with keys:
+
+			:status: (dict) number of drawings indexed by status
+			:prog: (dict) number of drawings indexed by the last layout program used
+			:time: (float) time in seconds of all drawings
+			:time_max: (float) the longest time of a drawing
+			:slowest: (int) index of the longest drawing
+
+		:rtype: dict
+
+		>>> RenderBatch.get_statistics([{'index': 0, 'prog': 'dot', 'status': 'ok', 'time': 0.5}, {'index': 1, 'prog': 'sfdp', 'status': 'ok', 'time': 2.0}])
+		{'status': {'ok': 2}, 'prog': {'dot': 1, 'sfdp': 1}, 'time': 2.5, 'time_max': 2.0, 'slowest': 1}
+		"""
+		statistics = {'status': {}, 'prog': {}, 'time': 0.0, 'time_max': 0.0, 'slowest': None}
+		for result in results:
+			statistics['status'][result['status']] = statistics['status'].get(result['status'], 0) + 1
+			statistics['prog'][result['prog']] = statistics['prog'].get(result['prog'], 0) + 1
+			statistics['time'] += result['time']
+			if statistics['slowest'] is None or result['time'] > statistics['time_max']:
+				statistics['time_max'] = result['time']
+				statistics['slowest'] = result['index']
+		return statistics
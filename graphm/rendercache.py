@@ -0,0 +1,199 @@
+'''
+Created on Oct 19, 2026
+'''
+from collections import OrderedDict
+import hashlib
+import os
+import re
+import shutil
+
+class RenderCache(object):
+	""" Cache on disk the drawings of graphs
+
+	A drawing is indexed by a hash of the DOT text of the graph, the layout and the format,
+	so an identical graph is drawn only once. Files are kept in a directory and the least recently
+	used ones are removed when the size of the cache exceeds its limit
+
+	:var str directory: default directory of the cache
+
+		**files/cache**
+
+	:var int size_max: default maximum size of the cache in bytes
+
+		**268435456** / 256 MB
+
+	.. CAUTION:: Instance variables
+
+	:var str directory: directory of the cache
+	:var int size_max: maximum size of the cache in bytes
+	:var OrderedDict files: size of cached files indexed by name, from the least recently used
+	:var int size: size of cached files in bytes
+	:var int hits: number of drawings found in cache
+	:var int misses: number of drawings made
+
+	>>> import tempfile
+	>>> cache = RenderCache(tempfile.mkdtemp(), size_max=10)
+	>>> key = RenderCache.get_key('digraph { A -> B }', {'prog': 'dot'}, 'svg')
+	>>> cache.get(key, 'svg') is None
+	True
+	>>> path = cache.put(key, 'svg', b'<svg/>')
+	>>> cache.get(key, 'svg') == path
+	True
+	>>> _ = cache.put(RenderCache.get_key('digraph { B }', {'prog': 'dot'}, 'svg'), 'svg', b'<svg/>')
+	>>> cache.get(key, 'svg') is None, cache.size
+	(True, 6)
+	"""
+	directory = 'files/cache'
+	size_max = 256 * 2**20
+
+	def __init__(self, directory: str='', size_max: int=0):
+		""" Set the cache from the files already present in the directory
+
+		:param str directory: directory of the cache, created if missing
+
+			default = :attr:`RenderCache.directory`
+
+		:param int size_max: maximum size of the cache in bytes
+
+			default = :attr:`RenderCache.size_max`
+		"""
+		self.directory = directory if directory else RenderCache.directory
+		self.size_max = size_max if size_max else RenderCache.size_max
+		self.hits = 0
+		self.misses = 0
+		os.makedirs(self.directory, exist_ok=True)
+
+		# files already cached, from the least recently used
+		entries = sorted((entry for entry in os.scandir(self.directory) if entry.is_file() and not entry.name.endswith('.tmp')), key=lambda entry: entry.stat().st_mtime)
+		self.files = OrderedDict((entry.name, entry.stat().st_size) for entry in entries)
+		self.size = sum(self.files.values())
+
+	def __repr__(self) -> str:
+		""" Return the number of files, the size and the hits and misses of the cache
+		"""
+		return f"files={len(self.files)} size={self.size} hits={self.hits} misses={self.misses}"
+
+	@staticmethod
+	def get_dot(viz: 'pygraphviz.AGraph') -> str:
+		""" Return the canonical DOT text of the viz
+		
+		After a first layout Graphviz declares the default label of nodes, which is removed
+		
+		:param pygraphviz.AGraph viz: the graph
+		
+		:return: the graph in DOT format
+		:rtype: str
+		"""
+		return re.sub(r'(?m)^\s*label="\\N",?\n', '', viz.string())
+
+	@staticmethod
+	def get_key(dot: str, layout: dict, ext: str) -> str:
+		""" Return the key of a drawing
+
+		:param str dot: the graph in DOT format
+		:param dict layout: arguments of the layout, see :meth:`pygraphviz.AGraph.layout`
+		:param str ext: format of the drawing
+
+		:return: a sha256 hash in hexadecimal
+		:rtype: str
+
+		>>> RenderCache.get_key('graph {}', {'prog': 'dot'}, 'png') == RenderCache.get_key('graph {}', {'prog': 'dot'}, 'svg')
+		False
+		"""
+		layout = ';'.join(f"{key}={value}" for key, value in sorted(layout.items()))
+		return hashlib.sha256(f"{layout}\0{ext}\0{dot}".encode()).hexdigest()
+
+	def get(self, key: str, ext: str) -> str:
+		""" Return the path of a cached drawing and mark it as the most recently used
+
+		:param str key: key of the drawing, see :meth:`RenderCache.get_key`
+		:param str ext: format of the drawing
+
+		:return: the path of the drawing or None if not cached
+		:rtype: str
+		"""
+		name = f"{key}.{ext}"
+		path = os.path.join(self.directory, name)
+		if name not in self.files:
+			return None
+		if not os.path.exists(path):
+			# removed by another process
+			self.size -= self.files.pop(name)
+			return None
+		self.files.move_to_end(name)
+		os.utime(path)
+		return path
+
+	def put(self, key: str, ext: str, content) -> str:
+		""" Add a drawing in cache and remove the least recently used drawings over the size limit
+
+		:param str key: key of the drawing, see :meth:`RenderCache.get_key`
+		:param str ext: format of the drawing
+		:param content: the drawing in bytes or the path of the drawing file
+
+		:return: the path of the cached drawing
+		:rtype: str
+		"""
+		name = f"{key}.{ext}"
+		path = os.path.join(self.directory, name)
+		# written in a temporary file then renamed, readers never see a partial drawing
+		path_tmp = f"{path}.{os.getpid()}.tmp"
+		if isinstance(content, bytes):
+			with open(path_tmp, 'wb') as f:
+				f.write(content)
+		else:
+			shutil.copyfile(content, path_tmp)
+		os.replace(path_tmp, path)
+
+		if name in self.files:
+			self.size -= self.files.pop(name)
+		self.files[name] = os.path.getsize(path)
+		self.size += self.files[name]
+
+		while self.size > self.size_max and len(self.files) > 1:
+			name_old, size = self.files.popitem(last=False)
+			self.size -= size
+			try:
+				os.remove(os.path.join(self.directory, name_old))
+			except FileNotFoundError:
+				pass
+		return path
+
+	def draw(self, viz: 'pygraphviz.AGraph', path: str=None, ext: str='png', layout: dict=None) -> str:
+		""" Draw the viz or get its drawing from cache
+
+		:param pygraphviz.AGraph viz: the graph to draw
+		:param str path: path to write the drawing, if None only the cached drawing is given
+		:param str ext: format of the drawing
+		:param dict layout: arguments of the layout, see :meth:`pygraphviz.AGraph.layout`
+
+			default = None / {'prog': 'dot'}
+
+		:return: the path of the cached drawing
+		:rtype: str
+
+		The layout is made on a copy of the viz, so the viz keeps the same DOT text and key
+		for its next drawings
+
+		>>> import pygraphviz, tempfile
+		>>> cache = RenderCache(tempfile.mkdtemp())
+		>>> viz = pygraphviz.AGraph('digraph { A -> B }')
+		>>> cache.draw(viz, ext='svg') == cache.draw(viz, ext='svg')
+		True
+		>>> cache.hits, cache.misses
+		(1, 1)
+		"""
+		layout = layout if layout else {'prog': 'dot'}
+		key = RenderCache.get_key(RenderCache.get_dot(viz), layout, ext)
+		path_cached = self.get(key, ext)
+		if path_cached is None:
+			self.misses += 1
+			viz = viz.copy()
+			viz.layout(**layout)
+			path_cached = self.put(key, ext, viz.draw(format=ext))
+		else:
+			self.hits += 1
+
+		if path is not None:
+			shutil.copyfile(path_cached, path)
+		return path_cached
@@ -0,0 +1,163 @@
+'''
+Created on Oct 19, 2026
+'''
+
+class TopologicalOrder(object):
+	""" Maintain online a topological order of a directed acyclic graph
+
+	Edges are inserted one by one with the algorithm of Pearce-Kelly: when an edge goes backward
+	in the order, only the nodes between its two ends are searched and reordered.
+	An edge creating a cycle is rejected before being inserted, so the graph stays acyclic.
+
+	.. IMPORTANT:: nodes are indexes from 0 to dim - 1
+
+	.. CAUTION:: Instance variables
+
+	:var list order: indexes of nodes in topological order
+	:var list position: position of each node in the order
+	:var list successors: set of successors for each node
+	:var list ancestors: set of ancestors for each node
+	:var list nodes: names of nodes used in messages, indexes by default
+
+	>>> t = TopologicalOrder(4, [(0, 1), (1, 2)])
+	>>> t.order
+	[0, 1, 2, 3]
+	>>> t.add_edge(3, 0)
+	>>> t.order
+	[3, 0, 1, 2]
+	>>> t.add_edge(2, 3)
+	Traceback (most recent call last):
+	...
+	ValueError: The edge 2 -> 3 creates a cycle: 2 -> 3 -> 0 -> 1 -> 2
+	"""
+
+	def __init__(self, dim: int=0, edges: iter=(), nodes: list=None):
+		""" Set an order of nodes without edges, then insert the given edges
+
+		:param int dim: number of nodes
+		:param iter edges: edges in tuple (m, n) inserted in the given order
+		:param list nodes: names of nodes used in messages
+
+			default = None / indexes of nodes
+		"""
+		self.order = list(range(dim))
+		self.position = list(range(dim))
+		self.successors = [set() for _ in range(dim)]
+		self.ancestors = [set() for _ in range(dim)]
+		self.nodes = nodes
+		for m, n in edges:
+			self.add_edge(m, n)
+
+	def __len__(self) -> int:
+		""" Return the number of nodes
+		"""
+		return len(self.order)
+
+	def __repr__(self) -> str:
+		""" Return the dimension and the order
+
+		>>> TopologicalOrder(3, [(2, 0)])
+		TopologicalOrder(3, [2, 1, 0])
+		"""
+		return f"TopologicalOrder({len(self.order)}, {self.order})"
+
+	def add_node(self) -> int:
+		""" Add a node without edges at the end of the order
+
+		:return: index of the new node
+		:rtype: int
+
+		>>> t = TopologicalOrder(2)
+		>>> t.add_node()
+		2
+		"""
+		node = len(self.order)
+		self.order.append(node)
+		self.position.append(node)
+		self.successors.append(set())
+		self.ancestors.append(set())
+		return node
+
+	def add_edge(self, m: int, n: int) -> None:
+		""" Insert the edge m -> n and reorder the nodes between n and m if needed
+
+		The nodes reached from n and placed before m, and the nodes reaching m and placed after n,
+		are the only ones visited. If m is reached from n, the edge is rejected
+
+		:param int m: starting node of edge
+		:param int n: ending node of edge
+
+		If the edge creates a cycle a ValueError is raised with the nodes of the cycle
+
+		>>> t = TopologicalOrder(3, [(0, 1), (1, 2)])
+		>>> t.add_edge(2, 2)
+		Traceback (most recent call last):
+		...
+		ValueError: The edge 2 -> 2 creates a cycle: 2 -> 2
+		"""
+		if n in self.successors[m]:
+			return
+		if m == n:
+			self.raise_cycle(m, n, [])
+
+		lower, upper = self.position[n], self.position[m]
+		if lower < upper:
+			# forward search from n, limited to the nodes before m
+			ancestor = {n: None}
+			nodes = [n]
+			while nodes:
+				node = nodes.pop()
+				for successor in self.successors[node]:
+					if successor == m:
+						path = [node]
+						while ancestor[path[-1]] is not None:
+							path.append(ancestor[path[-1]])
+						self.raise_cycle(m, n, path[::-1])
+					if successor not in ancestor and self.position[successor] < upper:
+						ancestor[successor] = node
+						nodes.append(successor)
+			nodes_forward = list(ancestor)
+
+			# backward search from m, limited to the nodes after n
+			visited = {m}
+			nodes = [m]
+			while nodes:
+				node = nodes.pop()
+				for node_ancestor in self.ancestors[node]:
+					if node_ancestor not in visited and self.position[node_ancestor] > lower:
+						visited.add(node_ancestor)
+						nodes.append(node_ancestor)
+			nodes_backward = list(visited)
+
+			# the nodes reaching m take the first positions, those reached from n the next ones
+			nodes_backward.sort(key=self.position.__getitem__)
+			nodes_forward.sort(key=self.position.__getitem__)
+			positions = sorted(self.position[node] for node in nodes_backward + nodes_forward)
+			for position, node in zip(positions, nodes_backward + nodes_forward):
+				self.order[position] = node
+				self.position[node] = position
+
+		self.successors[m].add(n)
+		self.ancestors[n].add(m)
+
+	def remove_edge(self, m: int, n: int) -> None:
+		""" Remove the edge m -> n, the order stays valid
+
+		:param int m: starting node of edge
+		:param int n: ending node of edge
+		"""
+		self.successors[m].discard(n)
+		self.ancestors[n].discard(m)
+
+	def raise_cycle(self, m: int, n: int, path: list) -> None:
+		""" Raise a ValueError for the edge m -> n closing the path from n to m
+
+		:param int m: starting node of edge
+		:param int n: ending node of edge
+		:param list path: nodes of the path from n to m, m excluded
+		"""
+		def name(node: int) -> str:
+			return str(self.nodes[node]) if self.nodes is not None and node < len(self.nodes) else str(node)
+
+		cycle = ' -> '.join(name(node) for node in [m] + path + [m])
+		raise ValueError(f"The edge {name(m)} -> {name(n)} creates a cycle: {cycle}")
@@ -254,3 +254,26 @@ print('c', mc['connect'])
 print('d', mc['deep'])
 """
 
+
+"""
+	tests automatic closure
+"""
+m = MatrixBinary(random=(100, 100), level=10)
+estimate = m.closure_estimate()
+print('deep', estimate['deep'])
+print('costs', estimate['costs'])
+result = m.closure()
+print('strategy', result['strategy'], 'cost', result['cost'])
+print('closure == reflexive', result['closure'] == m.closure_reflexive()['closure'])
+
+
+"""
+	tests edges by iterating set bits
+"""
+import time
+m = MatrixBinary(random=(1000, 1000), level=10)
+time_start = time.time()
+edges = list(MatrixBinary.iter_edges(m.matrixM, m.dimN))
+print('iter_edges', len(edges), 'time', time.time() - time_start)
+edges_str = [(i, j) for i, line in enumerate(m.matrixM) for j, c in enumerate(m.get_int2str(line, m.dimN)) if c == '1']
+print('iter_edges == str', edges == edges_str)
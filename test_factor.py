@@ -52,6 +52,16 @@ print('end')
 """
 
 
+"""
+	tests addition chains
+"""
+print('exponent, operations, operations_w, operations_c, valid_w, valid_c')
+for i in range(2, m):
+	f = Factor(i)
+	f_w = Factor(i, chain='window')
+	f_c = Factor(i, chain='shortest')
+	print(i, f.operations(), f_w.operations(), f_c.operations(), f_w.power(3)[0] == 3**i, f_c.power(3)[0] == 3**i, sep=',')
+
 """
 	tests on numbers
 """
@@ -215,3 +215,85 @@ print(g.viz.string())
 #g = Graph(mt, nodes)
 #g.matrix2viz(label="G'")
 #g.draw(f"{file}-final.png")
+
+"""
+	bulk construction of a large viz
+"""
+import datetime
+import random
+dim = 1000
+rows = [[0] * dim for _ in range(dim)]
+for _ in range(50000):
+	rows[random.randrange(dim)][random.randrange(dim)] = 1
+t1 = datetime.datetime.now()
+g = Graph(boolean=rows, node_style='int')
+t2 = datetime.datetime.now()
+print(repr(g), (t2 - t1).total_seconds())
+
+"""
+	streaming of a huge graph in DOT format without viz
+"""
+import io
+dim = 3000
+rows = (random.getrandbits(dim) & random.getrandbits(dim) & random.getrandbits(dim) for _ in range(dim))
+t1 = datetime.datetime.now()
+with open('files/graph_huge.dot', 'w') as f:
+	Graph().write_dot(f, list(rows), node_style='int')
+t2 = datetime.datetime.now()
+print('dot', (t2 - t1).total_seconds())
+f = io.StringIO()
+Graph().write_dot(f, graphm.MatrixBinary(random=(6, 6)))
+print(f.getvalue())
+#Graph().draw_dot(graphm.MatrixBinary(random=(60, 60)), 'files/graph_huge.svg', ext='svg')
+
+"""
+	cache of drawings
+"""
+cache = graphm.RenderCache('files/cache')
+for _ in range(10):
+	t1 = datetime.datetime.now()
+	Graph(boolean=['00010', '01100', '10000', '10100', '00000']).draw('files/graph_cached.svg', ext='svg', cache=cache)
+	t2 = datetime.datetime.now()
+	print(cache, (t2 - t1).total_seconds())
+
+"""
+	batch of drawings, concurrently with a timeout
+"""
+batch = graphm.RenderBatch(timeout=30, cache=cache)
+for i in range(20):
+	batch.add(Graph(binary=graphm.MatrixBinary(random=(12, 12)).matrixM), f"files/graph_batch_{i}.svg", ext='svg')
+results = batch.run(executor=4)
+for result in results:
+	print(result['index'], result['status'], result['prog'], result['time'])
+print(graphm.RenderBatch.get_statistics(results))
+
+"""
+	condensed drawing of a large graph by its strongly connected components
+"""
+dim = 1500
+mb = graphm.MatrixBinary(empty=(dim, dim))
+for m in range(dim):
+	for _ in range(2):
+		# mostly forward edges, a few backward ones make cycles
+		n = random.randrange(m, min(dim, m + 60)) if random.random() < 0.97 else random.randrange(dim)
+		if n != m:
+			mb.matrixM[m] |= 1 << (dim - n - 1)
+mb.matrixM2N()
+t1 = datetime.datetime.now()
+g = Graph(condensed=mb, node_style='int', chains=True)
+g.viz.layout(prog='dot')
+t2 = datetime.datetime.now()
+print(g.__repr__(), len(g.condensation['components']), (t2 - t1).total_seconds())
+
+"""
+	update of the viz with only the changed edges
+"""
+dim = 2000
+rows = [random.getrandbits(dim) & random.getrandbits(dim) & random.getrandbits(dim) & random.getrandbits(dim) for _ in range(dim)]
+g = Graph(binary=rows, node_style='int')
+for _ in range(5):
+	rows[random.randrange(dim)] ^= 1 << random.randrange(dim)
+	t1 = datetime.datetime.now()
+	changes = g.update_from_binary(rows, node_style='int')
+	t2 = datetime.datetime.now()
+	print(changes, (t2 - t1).total_seconds())
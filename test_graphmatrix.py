@@ -32,3 +32,11 @@ print(g3.viz.string())
 #g = GraphM(mt, nodes)
 #g.matrix2viz(label="G'")
 #g.draw(f"{file}-final.png")
+
+"""
+	slides of the closure drawn with the same positions of nodes
+"""
+slides = graphm.MatrixBinarySlides(mb.closure_slides())
+paths = g2.draw_slides(slides, f"{file}-slide{{deep}}.png")
+paths = g2.draw_slides(slides, f"{file}-closure{{deep}}.png", closure=True)
+print(paths)
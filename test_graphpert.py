@@ -10,6 +10,29 @@ pert = {'A': ('', 2), 'B': ('', 3), 'P': ('', 5), 'C': ('D', 5), 'D': ('A', 2),
 #g = GraphPert(pert=pert, graph_attr={'label':'"My first Pert"', 'ranksep':'1.0 equally'})
 g = GraphPert(pert=pert, graph_attr={'label':'"My first Pert"', 'ransep': 1})
 print(g)
+print(g.viz)
+g.draw('files/pert_first.svg', ext='svg')
+for task, times in g.tasks_times.items():
+	print(task, times)
+print('critical', g.path_unique)
+for path in g.get_paths_critical():
+	print(' '.join(g.nodes[i] for i in path))
+
+# positions of nodes given by ranks, drawn without the layout of dot
+g = GraphPert(pert=pert, pinned=True)
+g.draw('files/pert_pinned.svg', ext='svg')
+print([len(layer) for layer in g.get_layers()])
+
+# schedule only
+g = GraphPert(pert=pert, viz=False)
+print(g)
+print(g.get_schedule())
+
+# update durations without rebuilding
+g.update_duration('C', 9)
+print('duration', g.get_schedule()['duration'], 'critical', g.get_schedule()['critical'])
+g.update_duration('C', 5)
+print('duration', g.get_schedule()['duration'], 'critical', g.get_schedule()['critical'])
 
 """
 g = GraphPert(ancestors={
@@ -65,3 +88,13 @@ print(g.viz.string())
 #g.matrix2viz(label="G'")
 #g.draw(f"{file}-final.png")
 """
+
+"""
+	batch of scenarios
+"""
+import numpy
+network = g.get_network()
+durations = numpy.random.default_rng(0).integers(1, 12, size=(1000, len(network['tasks'])))
+result = g.get_schedule_batch(durations)
+print('duration', result['duration'].mean(), result['duration'].max())
+print('criticality', result['criticality'])
@@ -0,0 +1,23 @@
+import subprocess
+import sys
+
+"""
+	import time of the package, graphviz must be loaded only by graphs
+"""
+def time_import(code: str, loops: int=5) -> tuple:
+	code = "import sys, time\nt = time.perf_counter()\n" + code + "\nprint(time.perf_counter() - t, 'pygraphviz' in sys.modules)"
+	times = []
+	for _ in range(loops):
+		out = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True).stdout.split()
+		times.append(float(out[0]))
+	return min(times), out[1] == 'True'
+
+for name, code, graphviz in (
+	('package', "import graphm", False),
+	('matrix', "import graphm\ngraphm.MatrixBinary(random=(20, 20)).closure()", False),
+	('pert', "from graphm import GraphPert\nGraphPert(pert={'A': ('', 2), '<': ('A', 0)}, viz=False)", False),
+	('graph', "import graphm\ngraphm.Graph(boolean=['01', '00'])", True),
+	):
+	duration, loaded = time_import(code)
+	print(f"{name:8} {duration * 1000:8.2f} ms  pygraphviz {loaded}")
+	assert loaded == graphviz, f"pygraphviz loaded: {loaded} for {name}"
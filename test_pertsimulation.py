@@ -0,0 +1,24 @@
+from graphm import GraphPert
+from graphm import PertSimulation
+
+pert = {'A': ('', 2), 'B': ('', 3), 'C': ('D', 5), 'D': ('A', 2), 'E': ('A', 1), 'F': ('D,E,G', 3), 'G': ('B', 2), 'H': ('F,K', 2), 'I': ('B', 1), 'J': ('C,H', 2), 'K': ('I', 3), 'L': ('', 10), '<': ('J,L', 0)}
+estimates = {'A': (1, 2, 4), 'B': (2, 3, 6), 'C': (3, 5, 9), 'D': (1, 2, 3), 'F': (2, 3, 7), 'L': (8, 10, 16)}
+
+g = GraphPert(pert=pert, viz=False)
+print(g.get_schedule()['duration'])
+
+"""
+	beta-PERT
+"""
+simulation = PertSimulation(g, estimates, seed=1)
+for statistics in simulation.iter_run(50000, executor=2):
+	print(statistics['scenarios'], statistics['mean'], statistics['percentiles'])
+print('criticality', statistics['criticality'])
+print('sensitivity', statistics['sensitivity'])
+
+"""
+	triangular
+"""
+simulation = PertSimulation(g, estimates, distribution='triangular', seed=1)
+statistics = simulation.run(50000)
+print(statistics['mean'], statistics['std'], statistics['percentiles'])
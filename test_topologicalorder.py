@@ -0,0 +1,42 @@
+import random
+from graphm import GraphPert
+from graphm import MatrixBinary
+from graphm import TopologicalOrder
+
+"""
+	streaming edges
+"""
+order = TopologicalOrder(6)
+for m, n in ((0, 1), (4, 0), (1, 3), (5, 4), (3, 2)):
+	order.add_edge(m, n)
+	print(m, n, order.order)
+try:
+	order.add_edge(2, 5)
+except ValueError as e:
+	print(e)
+
+"""
+	random DAG in matrix
+"""
+dim = 200
+m = MatrixBinary(empty=(dim, dim))
+order = m.get_order()
+rejected = 0
+for _ in range(2000):
+	try:
+		m.add_edge(random.randrange(dim), random.randrange(dim), order)
+	except ValueError:
+		rejected += 1
+print('edges', MatrixBinary.get_edges_count(m), 'rejected', rejected)
+
+"""
+	pert
+"""
+pert = {'A': ('', 2), 'B': ('', 3), 'C': ('D', 5), 'D': ('A', 2), 'E': ('A', 1), 'F': ('D,E,G', 3), 'G': ('B', 2), 'H': ('F,K', 2), 'I': ('B', 1), 'J': ('C,H', 2), 'K': ('I', 3), 'L': ('', 10), '<': ('J,L', 0)}
+g = GraphPert(pert=pert, viz=False)
+print(g.get_pert_order(pert))
+pert['A'] = ('J', 2)
+try:
+	g = GraphPert(pert=pert, viz=False)
+except ValueError as e:
+	print(e)